@@ -0,0 +1,118 @@
+"""Script time saved by fragment-scoped reruns.
+
+Every interaction used to re-execute the whole script (and chat turns or the
+🤖 button ran it twice because of ``st.rerun()``). Now each one reruns only
+its fragments. This benchmark drives each interaction in ``AppTest`` twice
+and times both paths: once with ``st.fragment`` replaced by a pass-through,
+so the click reruns the whole script (plus the extra full run the old
+``st.rerun()`` caused; scoped ``st.rerun`` calls become no-ops), and once
+with real fragments, so only the fragment reruns. Bookings and wishlist
+hearts go to a scratch ledger and interaction log, and every booking is for
+a later week than the last.
+
+    python -m benchmarks.fragments [--runs 20]
+"""
+
+import argparse
+import itertools
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+import streamlit as st
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def _chat_turn(at):
+    at.text_input(key="chat_input").input("hello")
+    return at.button(key="send_message").click()
+
+
+_weeks = itertools.count(1)
+
+
+def _next_week(at):
+    """Move the stay dates a week on, so each booking finds its listing free"""
+    check_in = date.today() + timedelta(weeks=next(_weeks))
+    at.date_input(key="check_in").set_value(check_in)
+    at.date_input(key="check_out").set_value(check_in + timedelta(days=3))
+
+
+def _card_button(prefix):
+    def act(at):
+        return [button for button in at.button if button.key and button.key.startswith(prefix)][0].click()
+    return act
+
+
+# interaction -> (untimed setup or None, widget action, extra full runs the old ``st.rerun()`` added)
+INTERACTIONS = {
+    "chat turn": (None, _chat_turn, 1),
+    "toggle assistant": (None, lambda at: at.button(key="chatbot_toggle").click(), 1),
+    "🤖 on a card": (None, lambda at: [button for button in at.button if button.label == "🤖"][0].click(), 1),
+    "wishlist toggle": (None, _card_button("wish_"), 0),
+    "book now": (_next_week, _card_button("book_"), 0),
+}
+
+_fragment = st.fragment
+_rerun = st.rerun
+
+
+def _no_fragment(func=None, **options):
+    """``st.fragment`` stand-in that leaves the function a plain part of the script"""
+    return func if func is not None else (lambda f: f)
+
+
+def measure(runs, fragments):
+    """{interaction: [seconds per run]} with or without fragment-scoped reruns"""
+    from streamlit.testing.v1 import AppTest
+
+    st.fragment = _fragment if fragments else _no_fragment
+    st.rerun = _rerun if fragments else (lambda *args, **kwargs: None)
+    try:
+        at = AppTest.from_file(APP, default_timeout=120)
+        at.run()
+        samples = {}
+        for label, (setup, act, extra) in INTERACTIONS.items():
+            samples[label] = []
+            for _ in range(runs):
+                # A full (untimed) run first: after a fragment rerun only that fragment is in the tree
+                at.session_state.show_chatbot = True
+                at.run()
+                if setup is not None:
+                    setup(at)
+                    at.run()
+                started = time.perf_counter()
+                act(at).run()
+                for _ in range(0 if fragments else extra):
+                    at.run()
+                samples[label].append(time.perf_counter() - started)
+                if at.exception:
+                    raise RuntimeError(at.exception[0].value)
+        return samples
+    finally:
+        st.fragment = _fragment
+        st.rerun = _rerun
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="nexusstay-fragments-")
+    os.environ["NEXUSSTAY_LEDGER"] = os.path.join(scratch, "bookings.db")
+    os.environ["NEXUSSTAY_INTERACTIONS"] = os.path.join(scratch, "interactions.db")
+    before = measure(args.runs, fragments=False)
+    after = measure(args.runs, fragments=True)
+    print(f"median of {args.runs} measured runs per interaction")
+    print(f"{'interaction':<20}{'before ms':>12}{'after ms':>12}{'saved':>10}")
+    for label in INTERACTIONS:
+        full, scoped = statistics.median(before[label]), statistics.median(after[label])
+        print(f"{label:<20}{full * 1000:>12.1f}{scoped * 1000:>12.1f}{1 - scoped / full:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Seeded synthetic catalogs for benchmarking.
+
+Listings follow the shape of the seed data: a weighted mix of property
+types, each with its own price level, party size and amenity odds, spread
+over real destinations with a long-tailed popularity curve. The same seed
+always produces the same catalog.
+
+    python -m benchmarks.generate 100k [--seed 7] [--out data/bench/catalog-100k-7.arrow]
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from nexusstay.catalog import DATA_DIR, write_catalog
+from nexusstay.geo import KM_PER_DEGREE, PLACES
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# type -> (share, base nightly price, (min guests, max guests), title nouns)
+TYPES = {
+    "Luxury Apartment": (0.26, 380, (2, 6), ["Penthouse", "Residence", "Suite", "Apartment"]),
+    "Luxury Villa": (0.16, 820, (4, 12), ["Villa", "Estate", "Hacienda"]),
+    "Mountain Cabin": (0.14, 310, (2, 8), ["Cabin", "Chalet", "Lodge"]),
+    "Designer Loft": (0.14, 270, (1, 4), ["Loft", "Studio", "Atelier"]),
+    "Beach House": (0.18, 560, (4, 10), ["Beach House", "Bungalow", "Retreat"]),
+    "Historic Castle": (0.04, 1350, (8, 20), ["Castle", "Manor", "Chateau"]),
+    "Treehouse": (0.08, 240, (2, 4), ["Treehouse", "Canopy Hideaway", "Nest"]),
+}
+
+# destination -> (popularity weight, price factor, setting)
+LOCATIONS = {
+    "Manhattan, New York": (10, 1.5, "city"), "Brooklyn, New York": (5, 1.1, "city"),
+    "Malibu, California": (6, 1.6, "beach"), "Los Angeles, California": (7, 1.2, "city"),
+    "San Francisco, California": (6, 1.4, "city"), "Lake Tahoe, California": (3, 1.1, "mountain"),
+    "Aspen, Colorado": (5, 1.5, "mountain"), "Vail, Colorado": (3, 1.3, "mountain"),
+    "Chicago, Illinois": (5, 0.9, "city"), "Miami, Florida": (8, 1.2, "beach"),
+    "Key West, Florida": (3, 1.1, "beach"), "Austin, Texas": (4, 0.9, "city"),
+    "Honolulu, Hawaii": (5, 1.4, "beach"), "Maui, Hawaii": (4, 1.5, "beach"),
+    "Seattle, Washington": (4, 1.0, "city"), "Jackson Hole, Wyoming": (2, 1.4, "mountain"),
+    "Nashville, Tennessee": (3, 0.9, "city"), "Charleston, South Carolina": (2, 1.0, "beach"),
+    "Edinburgh, Scotland": (4, 1.0, "city"), "Scottish Highlands, Scotland": (2, 0.9, "mountain"),
+    "London, England": (9, 1.4, "city"), "Cotswolds, England": (2, 1.0, "countryside"),
+    "Paris, France": (9, 1.3, "city"), "Provence, France": (3, 1.1, "countryside"),
+    "Chamonix, France": (2, 1.3, "mountain"), "Nice, France": (3, 1.2, "beach"),
+    "Barcelona, Spain": (6, 1.0, "beach"), "Ibiza, Spain": (3, 1.4, "beach"),
+    "Lisbon, Portugal": (5, 0.8, "city"), "Algarve, Portugal": (3, 0.9, "beach"),
+    "Rome, Italy": (7, 1.1, "city"), "Amalfi Coast, Italy": (4, 1.6, "beach"),
+    "Tuscany, Italy": (4, 1.2, "countryside"), "Lake Como, Italy": (3, 1.5, "countryside"),
+    "Santorini, Greece": (4, 1.4, "beach"), "Mykonos, Greece": (3, 1.5, "beach"),
+    "Zermatt, Switzerland": (2, 1.7, "mountain"), "Vienna, Austria": (3, 0.9, "city"),
+    "Reykjavik, Iceland": (2, 1.1, "countryside"), "Dubrovnik, Croatia": (2, 1.0, "beach"),
+    "Tokyo, Japan": (8, 1.2, "city"), "Kyoto, Japan": (4, 1.1, "city"),
+    "Niseko, Japan": (2, 1.2, "mountain"), "Ubud, Bali": (5, 0.6, "countryside"),
+    "Seminyak, Bali": (4, 0.7, "beach"), "Phuket, Thailand": (4, 0.6, "beach"),
+    "Bangkok, Thailand": (4, 0.5, "city"), "Singapore, Singapore": (4, 1.2, "city"),
+    "Sydney, Australia": (5, 1.2, "beach"), "Queenstown, New Zealand": (2, 1.1, "mountain"),
+    "Cape Town, South Africa": (3, 0.7, "beach"), "Marrakech, Morocco": (3, 0.6, "city"),
+    "Dubai, United Arab Emirates": (5, 1.4, "city"), "Maldives, Maldives": (3, 2.2, "beach"),
+    "Tulum, Mexico": (4, 0.9, "beach"), "Mexico City, Mexico": (4, 0.6, "city"),
+    "Rio de Janeiro, Brazil": (3, 0.7, "beach"), "Banff, Canada": (2, 1.2, "mountain"),
+    "Vancouver, Canada": (3, 1.1, "city"), "Whistler, Canada": (2, 1.3, "mountain"),
+}
+
+# Listings scatter around their destination's center with this standard deviation
+LOCATION_SPREAD_KM = 8
+
+# amenity -> base probability, raised by a listing's type and setting below
+AMENITIES = {
+    "WiFi": 0.95, "Kitchen": 0.8, "AC": 0.6, "Parking": 0.5, "Workspace": 0.35, "Balcony": 0.3,
+    "Pool": 0.2, "Hot Tub": 0.2, "Gym": 0.15, "Fireplace": 0.15, "BBQ": 0.2, "Garden": 0.15,
+    "City View": 0.05, "Mountain View": 0.05, "Beachfront": 0.03, "Private Beach": 0.01,
+    "Hiking": 0.05, "Spa": 0.08, "Wine Cellar": 0.04, "Library": 0.05, "Art Studio": 0.03, "Historic": 0.02,
+}
+BOOSTS = {
+    "Luxury Villa": {"Pool": 0.6, "Garden": 0.4, "Hot Tub": 0.3, "Spa": 0.2},
+    "Mountain Cabin": {"Fireplace": 0.6, "Hot Tub": 0.4, "Hiking": 0.5, "Mountain View": 0.4},
+    "Designer Loft": {"Workspace": 0.4, "Art Studio": 0.3, "City View": 0.3},
+    "Beach House": {"Beachfront": 0.6, "Private Beach": 0.2, "BBQ": 0.3, "Pool": 0.3},
+    "Historic Castle": {"Historic": 0.9, "Library": 0.6, "Wine Cellar": 0.5, "Garden": 0.5, "Fireplace": 0.5},
+    "Luxury Apartment": {"Gym": 0.3, "City View": 0.5, "Pool": 0.2},
+    "Treehouse": {"Hiking": 0.5, "Garden": 0.3, "Balcony": 0.4},
+    "city": {"City View": 0.3, "Gym": 0.1},
+    "beach": {"Beachfront": 0.2, "Pool": 0.2},
+    "mountain": {"Mountain View": 0.4, "Hiking": 0.3, "Fireplace": 0.2},
+    "countryside": {"Garden": 0.3, "Hiking": 0.2, "Wine Cellar": 0.1},
+}
+ADJECTIVES = ["Serene", "Grand", "Hidden", "Modern", "Rustic", "Elegant", "Sunlit", "Secluded", "Iconic",
+              "Charming", "Panoramic", "Boutique", "Tranquil", "Opulent", "Cozy", "Breezy"]
+FEATURES = {
+    "city": ["Skyline Views", "Downtown", "Arts District", "Rooftop Terrace"],
+    "beach": ["Ocean Views", "Private Beach", "Sunset Deck", "Oceanfront"],
+    "mountain": ["Mountain Spa", "Ski Access", "Alpine Views", "Forest Retreat"],
+    "countryside": ["Vineyard Views", "Garden Escape", "Lakeside", "Countryside Calm"],
+}
+IMAGES = [
+    "https://images.unsplash.com/photo-1545324418-cc1a3fa10c00?q=80&w=2187&auto=format&fit=crop",
+    "https://images.unsplash.com/photo-1613490493576-7fde63acd811?q=80&w=2071&auto=format&fit=crop",
+    "https://images.unsplash.com/photo-1449158743715-0a90ebb6d2d8?q=80&w=2070&auto=format&fit=crop",
+    "https://images.unsplash.com/photo-1502672260266-1c1ef2d93688?q=80&w=2080&auto=format&fit=crop",
+    "https://images.unsplash.com/photo-1499793983690-e29da59ef1c2?q=80&w=2070&auto=format&fit=crop",
+    "https://images.unsplash.com/photo-1533154683836-84ea7a0bc310?q=80&w=2070&auto=format&fit=crop",
+]
+
+
+def generate(size, seed=7):
+    """A synthetic catalog frame with ``size`` listings"""
+    rng = np.random.default_rng(seed)
+    type_names = list(TYPES)
+    type_codes = rng.choice(len(TYPES), size, p=np.array([spec[0] for spec in TYPES.values()]) / sum(spec[0] for spec in TYPES.values()))
+    location_names = list(LOCATIONS)
+    weights = np.array([spec[0] for spec in LOCATIONS.values()], dtype=float)
+    location_codes = rng.choice(len(LOCATIONS), size, p=weights / weights.sum())
+    settings = np.array([spec[2] for spec in LOCATIONS.values()])[location_codes]
+
+    base = np.array([spec[1] for spec in TYPES.values()], dtype=float)[type_codes]
+    factor = np.array([spec[1] for spec in LOCATIONS.values()])[location_codes]
+    price = np.clip(np.round(base * factor * rng.lognormal(0, 0.35, size) / 5) * 5, 60, 5000).astype(np.int32)
+    discount = np.where(rng.random(size) < 0.3, rng.choice([5, 10, 15, 20, 25, 30], size), 0).astype(np.int8)
+    original_price = np.round(price / (1 - discount / 100)).astype(np.int32)
+
+    low, high = (np.array([spec[2][i] for spec in TYPES.values()])[type_codes] for i in (0, 1))
+    guests = rng.integers(low, high + 1).astype(np.int8)
+    bedrooms = np.maximum(1, (guests + 1) // 2 + rng.integers(-1, 2, size)).astype(np.int8)
+    bathrooms = np.maximum(1, bedrooms - rng.integers(0, 2, size)).astype(np.int8)
+
+    rating = np.round(5 - rng.beta(1.2, 8, size) * 1.2, 2).astype(np.float32)
+    reviews = rng.negative_binomial(2, 0.02, size).astype(np.int32)
+    superhost = rng.random(size) < 0.2 + 0.5 * (rating >= 4.8)
+    instant_book = rng.random(size) < 0.55
+    popular = reviews > np.percentile(reviews, 85)
+    featured = (rng.random(size) < 0.05) | ((rating >= 4.95) & (rng.random(size) < 0.3))
+
+    names = list(AMENITIES)
+    odds = np.tile(np.array(list(AMENITIES.values())), (size, 1))
+    for code, name in enumerate(type_names):
+        for amenity, boost in BOOSTS.get(name, {}).items():
+            odds[type_codes == code, names.index(amenity)] += boost
+    for setting in FEATURES:
+        for amenity, boost in BOOSTS[setting].items():
+            odds[settings == setting, names.index(amenity)] += boost
+    has = rng.random((size, len(names))) < odds
+    rows, columns = np.nonzero(has)
+    amenity_names = np.array(names, dtype=object)[columns]
+    amenities = [list(chunk) for chunk in np.split(amenity_names, np.cumsum(np.bincount(rows, minlength=size))[:-1])]
+
+    # Title nouns of every type in one flat array, indexed by type offset + pick
+    nouns = [spec[3] for spec in TYPES.values()]
+    noun_counts = np.array([len(values) for values in nouns])
+    noun_offsets = np.concatenate(([0], np.cumsum(noun_counts)[:-1]))
+    flat_nouns = np.array([value for values in nouns for value in values], dtype=object)
+    noun = flat_nouns[noun_offsets[type_codes] + rng.integers(0, noun_counts[type_codes])]
+    adjective = np.array(ADJECTIVES, dtype=object)[rng.integers(0, len(ADJECTIVES), size)]
+    feature_lists = {setting: np.array(values, dtype=object) for setting, values in FEATURES.items()}
+    feature = np.empty(size, dtype=object)
+    for setting, values in feature_lists.items():
+        members = settings == setting
+        feature[members] = values[rng.integers(0, len(values), members.sum())]
+    title = pd.Series(adjective) + " " + pd.Series(noun) + " " + pd.Series(feature)
+    city = pd.Series(np.array([name.split(",")[0] for name in location_names], dtype=object)[location_codes])
+    description = (pd.Series(adjective) + " " + pd.Series(noun).str.lower() + " in " + city
+                   + " for up to " + pd.Series(guests).astype(str) + np.where(guests == 1, " guest. ", " guests. ")
+                   + pd.Series(feature) + ", with hand-picked amenities.")
+
+    # Drawn last so every other column matches catalogs generated before coordinates existed
+    centers = np.array([PLACES[name] for name in location_names], dtype=np.float64)[location_codes]
+    spread = rng.normal(0, LOCATION_SPREAD_KM / KM_PER_DEGREE, (size, 2))
+    latitude = np.clip(centers[:, 0] + spread[:, 0], -90, 90).astype(np.float32)
+    longitude = (centers[:, 1] + spread[:, 1] / np.cos(np.radians(centers[:, 0]))).astype(np.float32)
+
+    return pd.DataFrame({
+        "id": np.arange(1, size + 1, dtype=np.int32),
+        "title": title,
+        "location": pd.Categorical.from_codes(location_codes, location_names),
+        "latitude": latitude,
+        "longitude": longitude,
+        "price": price,
+        "original_price": original_price,
+        "type": pd.Categorical.from_codes(type_codes, type_names),
+        "rating": rating,
+        "reviews": reviews,
+        "superhost": superhost,
+        "instant_book": instant_book,
+        "image": np.array(IMAGES, dtype=object)[rng.integers(0, len(IMAGES), size)],
+        "amenities": amenities,
+        "bedrooms": bedrooms,
+        "bathrooms": bathrooms,
+        "guests": guests,
+        "description": description,
+        "popular": popular,
+        "featured": featured,
+        "discount": discount,
+    })
+
+
+def catalog_path(size_label, seed=7):
+    return os.path.join(DATA_DIR, "bench", f"catalog-{size_label}-{seed}.arrow")
+
+
+def ensure_catalog(size_label, seed=7, path=None):
+    """Path of the generated catalog file, writing it first if it does not exist"""
+    path = path or catalog_path(size_label, seed)
+    if not os.path.exists(path):
+        write_catalog(generate(SIZES[size_label], seed), path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("size", choices=list(SIZES))
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out")
+    args = parser.parse_args()
+    path = args.out or catalog_path(args.size, args.seed)
+    write_catalog(generate(SIZES[args.size], args.seed), path)
+    print(f"Wrote {SIZES[args.size]:,} listings to {path}")
+
+
+if __name__ == "__main__":
+    main()
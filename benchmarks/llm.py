@@ -0,0 +1,81 @@
+"""Latency and throughput of the streaming concierge against the mock server.
+
+Runs ``--turns`` chat turns from ``--clients`` concurrent threads through one
+shared backend (as the app does) and reports time to first token, full reply
+time, throughput, how many turns fell back to the rule-based reply because
+every generation slot was busy, and how many TCP connections were opened.
+
+    python -m benchmarks.llm [--clients 16] [--turns 64] [--max-inflight 4]
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_llm import serve
+from nexusstay.chatbot import NexusStayChatbot
+from nexusstay.llm import BackendError, OpenAIBackend, chat_messages
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def turn(backend, question):
+    """(seconds to first token, seconds to full reply, chunks), or None if the backend refused"""
+    started = time.perf_counter()
+    first = None
+    chunks = 0
+    try:
+        for _ in backend.stream(chat_messages((), question)):
+            if first is None:
+                first = time.perf_counter() - started
+            chunks += 1
+    except BackendError:
+        return None
+    return first, time.perf_counter() - started, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=64)
+    parser.add_argument("--max-inflight", type=int, default=4)
+    parser.add_argument("--first-token", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    args = parser.parse_args()
+
+    server = serve(first_token=args.first_token, token_delay=args.token_delay)
+    backend = OpenAIBackend(f"http://127.0.0.1:{server.server_port}/v1", "mock",
+                            max_inflight=args.max_inflight, pool_size=args.max_inflight)
+    fallback = NexusStayChatbot()
+    questions = [f"Find me a beach villa for {n % 8 + 1} guests" for n in range(args.turns)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        results = list(pool.map(lambda question: turn(backend, question), questions))
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    streamed = [result for result in results if result is not None]
+    busy = len(results) - len(streamed)
+    rule_started = time.perf_counter()
+    for question in questions[:busy]:
+        fallback.rule_response(question)
+    rule_ms = (time.perf_counter() - rule_started) * 1000 / max(busy, 1)
+
+    print(f"{len(streamed)} streamed / {busy} rule fallbacks ({rule_ms:.3f} ms each) in {elapsed:.2f} s")
+    if streamed:
+        first = [result[0] * 1000 for result in streamed]
+        total = [result[1] * 1000 for result in streamed]
+        chunks = sum(result[2] for result in streamed)
+        print(f"first token ms  p50 {statistics.median(first):.1f}  p95 {percentile(first, 95):.1f}")
+        print(f"full reply ms   p50 {statistics.median(total):.1f}  p95 {percentile(total, 95):.1f}")
+        print(f"throughput      {len(streamed) / elapsed:.1f} replies/s, {chunks / elapsed:.0f} tokens/s")
+    print(f"connections     {server.connections} opened for {server.requests} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Local OpenAI-compatible mock that streams a canned reply.
+
+It serves ``POST /v1/chat/completions`` with ``stream: true`` as server-sent
+events over HTTP/1.1 keep-alive, with a configurable time to first token and
+delay per token, so the concierge backend can be tested without a model.
+
+    python -m benchmarks.mock_llm --port 8011 --first-token 0.3 --token-delay 0.02
+    NEXUSSTAY_LLM_URL=http://127.0.0.1:8011/v1 streamlit run app.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = (
+    "Happy to help! For a quiet luxury escape I would look at our mountain cabins in Aspen "
+    "or the beachfront villas in Malibu. Both have hot tubs, fast WiFi and instant booking, "
+    "and the Aspen cabin sleeps up to eight guests. Shall I check your dates?"
+)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions") or not body.get("stream"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.server.requests += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        time.sleep(self.server.first_token)
+        for i, word in enumerate(REPLY.split(" ")):
+            if i:
+                time.sleep(self.server.token_delay)
+            event = {"choices": [{"index": 0, "delta": {"content": f" {word}" if i else word}}]}
+            self._chunk(b"data: " + json.dumps(event).encode() + b"\n\n")
+            self.wfile.flush()
+        self._chunk(b"data: [DONE]\n\n")
+        self._chunk(b"")
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, first_token=0.2, token_delay=0.02):
+        super().__init__(address, MockHandler)
+        self.first_token = first_token
+        self.token_delay = token_delay
+        self.requests = 0
+        self.connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+def serve(port=0, first_token=0.2, token_delay=0.02):
+    """Start a mock server on a background thread; returns it (``server_port`` has the port)"""
+    server = MockServer(("127.0.0.1", port), first_token, token_delay)
+    threading.Thread(target=server.serve_forever, name="mock-llm", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--first-token", type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between tokens")
+    args = parser.parse_args()
+    server = MockServer(("127.0.0.1", args.port), args.first_token, args.token_delay)
+    print(f"mock LLM on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
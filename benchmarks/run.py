@@ -0,0 +1,256 @@
+"""Headless rerun-latency benchmark with regression gating.
+
+Each catalog size runs in its own worker process (so peak RSS is per size)
+against a generated catalog. Every iteration opens a new ``AppTest`` session
+and plays one user journey:
+
+* ``first_load``: a new session's first script run (process caches warm)
+* ``search``: type a query and press "AI Search"
+* ``slider``: move the price range
+* ``chat``: send a message to the assistant
+* ``booking``: pick dates and press "Book Now" on the first card
+
+The first iteration's load also reports the process's ``cold_start``, and
+``spawn_to_first_run`` adds interpreter start-up and imports on top of it.
+The app's imports are timed with ``-X importtime`` in a clean interpreter
+(best of five) and the slowest modules are listed. The script-run times for
+each scenario are summarized as p50/p95/p99. Against a baseline JSON the run
+fails (exit 1) when a p50 or p95, the import time or the spawn-to-first-run
+time gets slower, or peak RSS grows, by more than the tolerance.
+
+    python -m benchmarks.run --sizes 10k,100k --runs 20
+    python -m benchmarks.run --sizes 10k --save-baseline
+"""
+
+import argparse
+import ast
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from benchmarks.generate import SIZES, ensure_catalog
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SCENARIOS = ("first_load", "search", "slider", "chat", "booking")
+QUERIES = ("pool", "beach villa", "mountain cabin", "paris", "hot tub", "loft")
+MESSAGES = ("villa in malibu for 6 guests with a pool", "how do I book?", "cabins under $400", "cancellation policy")
+MIN_DELTA_MS = 5.0
+IMPORT_REPORT_TOP = 8
+IMPORT_REPEAT = 5
+
+
+def app_imports():
+    """Source of app.py's top-level import statements"""
+    with open(APP, encoding="utf-8") as handle:
+        tree = ast.parse(handle.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def _import_times(source):
+    """{top-level module: cumulative ms} from one ``-X importtime`` run of ``source``"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", source],
+        cwd=os.path.dirname(APP), check=True, capture_output=True, text=True,
+    ).stderr
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Unindented names are imported directly by the app, not by another module
+        if not name.startswith("  "):
+            packages[name.strip()] = int(cumulative) / 1000
+    return packages
+
+
+def import_report(repeat=IMPORT_REPEAT, top=IMPORT_REPORT_TOP):
+    """(total ms, [[module, ms]] of the slowest imports) for the app's imports, best of ``repeat`` interpreters"""
+    source = app_imports()
+    packages = min((_import_times(source) for _ in range(repeat)), key=lambda times: sum(times.values()))
+    slowest = sorted(packages.items(), key=lambda item: -item[1])[:top]
+    return round(sum(packages.values()), 2), [[name, round(ms, 2)] for name, ms in slowest]
+
+
+def percentiles(samples):
+    values = np.asarray(samples) * 1000
+    return {f"p{q}": round(float(np.percentile(values, q)), 2) for q in (50, 95, 99)}
+
+
+def _timed(run):
+    started = time.perf_counter()
+    at = run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return time.perf_counter() - started
+
+
+def journey(i, samples):
+    """Play one session's scenarios, appending seconds per scenario to ``samples``
+
+    Returns the wall-clock time at which the first script run finished.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=600)
+    samples["first_load"].append(_timed(at.run))
+    first_run = time.time()
+
+    at.text_input(key="search_input").input(QUERIES[i % len(QUERIES)])
+    at.button(key="search_main").click()
+    samples["search"].append(_timed(at.run))
+    at.text_input(key="search_input").input("")
+    at.button(key="search_main").click().run()
+
+    low = 100 + 25 * (i % 8)
+    at.slider(key="price_slider").set_value((low, low + 600))
+    samples["slider"].append(_timed(at.run))
+
+    at.session_state.show_chatbot = True
+    at.run()
+    at.text_input(key="chat_input").input(MESSAGES[i % len(MESSAGES)])
+    at.button(key="send_message").click()
+    samples["chat"].append(_timed(at.run))
+
+    # A fresh two-night window per iteration so bookings do not collide
+    check_in = date.today() + timedelta(days=7 + 2 * (i % 150))
+    at.date_input(key="check_in").set_value(check_in)
+    at.date_input(key="check_out").set_value(check_in + timedelta(days=2)).run()
+    book = next(button for button in at.button if button.key and button.key.startswith("book_"))
+    book.click()
+    samples["booking"].append(_timed(at.run))
+    return first_run
+
+
+def worker(size_label, runs, seed, spawned_at=None):
+    """Benchmark one catalog size in this process and return its summary"""
+    from streamlit.logger import set_log_level
+
+    set_log_level("error")
+    scratch = tempfile.mkdtemp(prefix="nexusstay-bench-")
+    os.environ["NEXUSSTAY_CATALOG"] = ensure_catalog(size_label, seed)
+    os.environ["NEXUSSTAY_LEDGER"] = os.path.join(scratch, "bookings.db")
+    os.environ["NEXUSSTAY_INTERACTIONS"] = os.path.join(scratch, "interactions.db")
+    os.environ.setdefault("NEXUSSTAY_CACHE_DIR", os.path.join(scratch, "cache"))
+    samples = {name: [] for name in SCENARIOS}
+    first_run = journey(0, samples)
+    for i in range(1, runs):
+        journey(i, samples)
+    return {
+        "listings": SIZES[size_label],
+        "runs": runs,
+        "cold_start_ms": round(samples["first_load"][0] * 1000, 2),
+        "spawn_to_first_run_ms": round((first_run - spawned_at) * 1000, 2) if spawned_at else None,
+        "scenarios": {name: percentiles(values) for name, values in samples.items()},
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def _slower(before, after, tolerance):
+    return bool(before) and after is not None and after > before * (1 + tolerance) and after - before > MIN_DELTA_MS
+
+
+def compare(results, baseline, tolerance, rss_tolerance):
+    """Human-readable regressions of ``results`` against ``baseline``"""
+    regressions = []
+    before, after = baseline.get("imports", {}).get("total_ms"), results["imports"]["total_ms"]
+    if _slower(before, after, tolerance):
+        regressions.append(f"import time: {before:.1f} -> {after:.1f} ms")
+    for size_label, result in results["sizes"].items():
+        base = baseline.get("sizes", {}).get(size_label)
+        if base is None:
+            continue
+        before, after = base.get("spawn_to_first_run_ms"), result["spawn_to_first_run_ms"]
+        if _slower(before, after, tolerance):
+            regressions.append(f"{size_label} spawn to first run: {before:.1f} -> {after:.1f} ms")
+        for name, stats in result["scenarios"].items():
+            for metric in ("p50", "p95"):
+                before = base["scenarios"].get(name, {}).get(metric)
+                after = stats[metric]
+                if _slower(before, after, tolerance):
+                    regressions.append(f"{size_label} {name} {metric}: {before:.1f} -> {after:.1f} ms")
+        before, after = base.get("peak_rss_mb"), result["peak_rss_mb"]
+        if before and after > before * (1 + rss_tolerance):
+            regressions.append(f"{size_label} peak RSS: {before:.0f} -> {after:.0f} MB")
+    return regressions
+
+
+def report(results):
+    imports = results["imports"]
+    print(f"app imports: {imports['total_ms']:.0f} ms ("
+          + ", ".join(f"{name} {ms:.0f}" for name, ms in imports["slowest"]) + ")")
+    for size_label, result in results["sizes"].items():
+        print(f"\n{size_label}: {result['listings']:,} listings, {result['runs']} runs, "
+              f"cold start {result['cold_start_ms']:.0f} ms, spawn to first run {result['spawn_to_first_run_ms']:.0f} ms, "
+              f"peak RSS {result['peak_rss_mb']:.0f} MB")
+        print(f"  {'scenario':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name, stats in result["scenarios"].items():
+            print(f"  {name:<12}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10k", help="comma-separated: " + ", ".join(SIZES))
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown of p50/p95")
+    parser.add_argument("--rss-tolerance", type=float, default=0.15, help="allowed growth of peak RSS")
+    parser.add_argument("--output", help="also write the results JSON here")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--spawned-at", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.runs, args.seed, args.spawned_at)))
+        return
+
+    total_ms, slowest = import_report()
+    results = {"imports": {"total_ms": total_ms, "slowest": slowest}, "sizes": {}}
+    for size_label in args.sizes.split(","):
+        if size_label not in SIZES:
+            parser.error(f"unknown size {size_label!r}")
+        ensure_catalog(size_label, args.seed)
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--worker", size_label, "--runs", str(args.runs),
+             "--seed", str(args.seed), "--spawned-at", repr(time.time())],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results["sizes"][size_label] = json.loads(output.strip().splitlines()[-1])
+    report(results)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+    if args.save_baseline:
+        baseline = {"sizes": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as handle:
+                baseline = json.load(handle)
+        baseline["imports"] = results["imports"]
+        baseline["sizes"].update(results["sizes"])
+        with open(args.baseline, "w") as handle:
+            json.dump(baseline, handle, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline) as handle:
+        regressions = compare(results, json.load(handle), args.tolerance, args.rss_tolerance)
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Data and search engines behind the NexusStay Streamlit app"""
@@ -0,0 +1,118 @@
+"""Amenity bitset index.
+
+Every listing's amenity list is encoded once into a row of packed ``uint64``
+words (64 amenities per word), so "has X", "has all of" and "has any of"
+queries are a couple of vectorized bitwise operations over the catalog.
+"""
+
+import numpy as np
+import pandas as pd
+
+WORD_BITS = 64
+
+if hasattr(np, "bitwise_count"):
+    popcount = np.bitwise_count
+else:
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        """Set bits per ``uint64`` word (for NumPy releases without ``bitwise_count``)"""
+        words = np.ascontiguousarray(words)
+        return _BYTE_COUNTS[words.view(np.uint8)].reshape(*words.shape, 8).sum(axis=-1)
+
+
+# _BYTE_BITS[value, bit]: whether ``bit`` is set in byte ``value``
+_BYTE_BITS = ((np.arange(256)[:, None] >> np.arange(8)) & 1).astype(np.int64)
+
+
+class AmenityIndex:
+    def __init__(self, vocabulary, bits):
+        self.vocabulary = tuple(vocabulary)
+        self.bits = bits
+        self.bits.flags.writeable = False
+        self._position = {name: i for i, name in enumerate(self.vocabulary)}
+        self._lower = [name.lower() for name in self.vocabulary]
+
+    @classmethod
+    def from_frame(cls, frame, column="amenities"):
+        """Encode the amenity lists of a catalog frame into packed bit rows"""
+        exploded = frame[column].explode().dropna()
+        vocabulary = sorted(set(exploded))
+        words = max(1, -(-len(vocabulary) // WORD_BITS))
+        bits = np.zeros((len(frame), words), dtype=np.uint64)
+        rows = exploded.index.to_numpy()
+        codes = pd.Categorical(exploded.to_numpy(), categories=vocabulary).codes
+        for code in range(len(vocabulary)):
+            word, bit = divmod(code, WORD_BITS)
+            bits[rows[codes == code], word] |= np.uint64(1 << bit)
+        return cls(vocabulary, bits)
+
+    def __len__(self):
+        return len(self.bits)
+
+    def query_words(self, names):
+        """Bit pattern for a set of amenity names; unknown names are ignored"""
+        query = np.zeros(self.bits.shape[1], dtype=np.uint64)
+        for name in names:
+            position = self._position.get(name)
+            if position is not None:
+                word, bit = divmod(position, WORD_BITS)
+                query[word] |= np.uint64(1 << bit)
+        return query
+
+    def _masked(self, query, rows):
+        bits = self.bits if rows is None else self.bits[rows]
+        if len(query) == 1:
+            return bits[:, 0] & query[0]
+        return bits & query
+
+    def has(self, name, rows=None):
+        """Boolean mask of listings offering ``name``"""
+        return self.has_any([name], rows)
+
+    def has_all(self, names, rows=None):
+        """Boolean mask of listings offering every amenity in ``names``"""
+        query = self.query_words(names)
+        if any(name not in self._position for name in names):
+            return np.zeros(len(self) if rows is None else len(rows), dtype=bool)
+        masked = self._masked(query, rows)
+        if masked.ndim == 1:
+            return masked == query[0]
+        return (masked == query).all(axis=1)
+
+    def has_any(self, names, rows=None):
+        """Boolean mask of listings offering at least one amenity in ``names``"""
+        masked = self._masked(self.query_words(names), rows)
+        if masked.ndim == 1:
+            return masked != 0
+        return (masked != 0).any(axis=1)
+
+    def match_fraction(self, names, rows=None):
+        """Share of ``names`` each listing offers (unknown names count as missing)"""
+        if not names:
+            return np.ones(len(self) if rows is None else len(rows), dtype=np.float32)
+        masked = self._masked(self.query_words(names), rows)
+        found = popcount(masked) if masked.ndim == 1 else popcount(masked).sum(axis=1)
+        return (found / len(names)).astype(np.float32)
+
+    def counts(self, rows=None):
+        """Listings having each amenity (in vocabulary order) among ``rows``, from one bincount per bit byte"""
+        bits = self.bits if rows is None else self.bits[rows]
+        columns = np.ascontiguousarray(bits.astype("<u8", copy=False)).view(np.uint8).reshape(len(bits), 8 * bits.shape[1])
+        used = -(-len(self.vocabulary) // 8)
+        per_byte = np.stack([np.bincount(columns[:, j], minlength=256) for j in range(used)]) if used else np.zeros((0, 256), dtype=np.int64)
+        return (per_byte @ _BYTE_BITS).reshape(-1)[:len(self.vocabulary)]
+
+    def matching(self, text):
+        """Amenity names containing ``text``, case-insensitively"""
+        text = text.lower()
+        return [name for name, lower in zip(self.vocabulary, self._lower) if text in lower]
+
+    def decode(self, row):
+        """Amenity names set for a single row"""
+        names = []
+        for position, name in enumerate(self.vocabulary):
+            word, bit = divmod(position, WORD_BITS)
+            if int(self.bits[row, word]) >> bit & 1:
+                names.append(name)
+        return names
@@ -0,0 +1,119 @@
+"""Availability calendar for the whole catalog.
+
+Blocked nights are kept in a (days x listings) bitmap packed into ``uint64``
+words. The words are stored day-major, so each 64-night word is one
+contiguous array over the catalog and "free for every night in
+[check_in, check_out)" is a masked bitwise test over the one or two words a
+stay spans, vectorized across all listings. Bookings flip bits in place;
+nothing is rebuilt. ``roll`` shifts the bitmap forward when the day changes,
+so a long-running server keeps a full horizon starting today.
+"""
+
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+WORD_BITS = 64
+ALL_BITS = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+class AvailabilityStore:
+    def __init__(self, size, start=None, horizon_days=365):
+        self.start = start or date.today()
+        self.horizon_days = horizon_days
+        self.size = size
+        self.blocked = np.zeros((-(-horizon_days // WORD_BITS), size), dtype=np.uint64)
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def end(self):
+        """First day past the bookable horizon"""
+        return self.start + timedelta(days=self.horizon_days)
+
+    def nights(self, check_in, check_out):
+        """Day offsets [first, last) of a stay, or None if it falls outside the calendar"""
+        first = (check_in - self.start).days
+        last = (check_out - self.start).days
+        if first < 0 or last > self.horizon_days or last <= first:
+            return None
+        return first, last
+
+    def _query_words(self, first, last):
+        """(word slice, bit pattern) covering nights [first, last)"""
+        lo_word, hi_word = first // WORD_BITS, (last - 1) // WORD_BITS
+        query = np.full(hi_word - lo_word + 1, ALL_BITS, dtype=np.uint64)
+        query[0] &= ALL_BITS << np.uint64(first % WORD_BITS)
+        query[-1] &= ALL_BITS >> np.uint64(WORD_BITS - 1 - (last - 1) % WORD_BITS)
+        return slice(lo_word, hi_word + 1), query
+
+    def available(self, check_in, check_out, rows=None):
+        """Boolean mask of listings free for every night of the stay"""
+        size = len(self) if rows is None else len(rows)
+        span = self.nights(check_in, check_out)
+        if span is None:
+            return np.zeros(size, dtype=bool)
+        words, query = self._query_words(*span)
+        blocked = self.blocked[words] if rows is None else self.blocked[words, rows]
+        free = (blocked[0] & query[0]) == 0
+        for word, bits in zip(blocked[1:], query[1:]):
+            free &= (word & bits) == 0
+        return free
+
+    def is_available(self, row, check_in, check_out):
+        return bool(self.available(check_in, check_out, np.array([row]))[0])
+
+    def block(self, row, check_in, check_out):
+        """Block the stay's nights for one listing; False if any night is already taken"""
+        span = self.nights(check_in, check_out)
+        if span is None:
+            return False
+        words, query = self._query_words(*span)
+        with self._lock:
+            if (self.blocked[words, row] & query).any():
+                return False
+            self.blocked[words, row] |= query
+            self.generation += 1
+        return True
+
+    def release(self, row, check_in, check_out):
+        """Free the stay's nights again, e.g. after a cancellation"""
+        span = self.nights(check_in, check_out)
+        if span is None:
+            return
+        words, query = self._query_words(*span)
+        with self._lock:
+            self.blocked[words, row] &= ~query
+            self.generation += 1
+
+    def roll(self, today=None):
+        """Move the calendar start to ``today``: past nights drop off and empty ones open at the end"""
+        days = ((today or date.today()) - self.start).days
+        if days <= 0:
+            return False
+        words, bits = divmod(days, WORD_BITS)
+        with self._lock:
+            rolled = np.zeros_like(self.blocked)
+            kept = self.blocked[words:]
+            if len(kept):
+                rolled[:len(kept)] = kept >> np.uint64(bits)
+                if bits:
+                    rolled[:len(kept) - 1] |= kept[1:] << np.uint64(WORD_BITS - bits)
+            self.blocked = rolled
+            self.start += timedelta(days=days)
+            self.generation += 1
+        return True
+
+    def replay(self, rows, stays):
+        """Block previously booked stays, clipped to the calendar (e.g. from the ledger at startup)"""
+        for row, (check_in, check_out) in zip(rows, stays):
+            check_in, check_out = max(check_in, self.start), min(check_out, self.end)
+            if row >= 0 and check_out > check_in:
+                words, query = self._query_words(*self.nights(check_in, check_out))
+                with self._lock:
+                    self.blocked[words, row] |= query
+        self.generation += 1
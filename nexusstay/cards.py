@@ -0,0 +1,90 @@
+"""Batched HTML for result cards.
+
+Each card comes from two templates compacted once at import. The part that
+only depends on the listing (image and deal badges, title, rating, location
+badges, amenity chips, price and room details) is rendered once and cached
+by catalog version and property id. A page then only fills in the
+per-query match bar. A grid row of cards goes to the browser as one HTML
+block; the Book / wishlist / AI buttons stay widgets under each card.
+"""
+
+import re
+from html import escape
+
+COLUMNS = 3
+AMENITY_CHIPS = 4
+
+# Leaves .card-body open: CARD_TEMPLATE appends the match bar and closes it
+STATIC_TEMPLATE = """
+<div style='position: relative;'>
+    <img src="{image}" class='card-image' alt="{title}">
+    {deal}{pick}
+</div>
+<div class='card-body'>
+    <div class='card-title-row'>
+        <strong>{title}</strong>
+        <div class='card-rating'>🤖 {rating}</div>
+    </div>
+    <div class='card-location'>📍 {location}{badges}</div>
+    <div class='card-amenities'>{amenities}</div>
+    <div class='card-price-row'>
+        <div><div class='card-price'>${price}/night</div>{original_price}</div>
+        <div class='card-details'>🛏️ {bedrooms} • 🛁 {bathrooms} • 👥 {guests}</div>
+    </div>
+"""
+CARD_TEMPLATE = """
+<div class='premium-dark-card'>
+    {static}
+        <div class='progress-bar'><div class='progress-fill' style='width: {match}%'></div></div>
+        <div class='card-match'>AI Match: {match}%</div>
+    </div>
+</div>
+"""
+DEAL = "<div class='card-deal'>🔥 AI DEAL {discount}% OFF</div>"
+PICK = "<div class='card-pick'>🤖 AI PICK</div>"
+VERIFIED = " <span class='superhost-badge'>AI VERIFIED</span>"
+INSTANT = " <span class='superhost-badge' style='background:linear-gradient(135deg, #00D4AA, #00E5C4)'>INSTANT</span>"
+ORIGINAL_PRICE = "<div class='card-original-price'>${original_price}</div>"
+
+
+def _compact(template):
+    """Template without the newlines and indentation used for readability"""
+    return re.sub(r"\n\s*", "", template)
+
+
+# Compiled once: each render is a single str.format call
+_fill_static = _compact(STATIC_TEMPLATE).format
+_fill_card = _compact(CARD_TEMPLATE).format
+
+
+def static_html(property, thumbnails=None):
+    """Listing-dependent part of a card (everything but the match bar)"""
+    discount = property.get('discount')
+    image = thumbnails.url(property['image'], "card") if thumbnails is not None else property['image']
+    return _fill_static(
+        image=escape(image),
+        title=escape(property['title']),
+        deal=DEAL.format(discount=discount) if discount else "",
+        pick=PICK if property['featured'] else "",
+        rating=round(property['rating'], 2),
+        location=escape(property['location']),
+        badges=(VERIFIED if property['superhost'] else "") + (INSTANT if property['instant_book'] else ""),
+        amenities=" ".join(f"<span class='amenity-item-dark'>{escape(amenity)}</span>"
+                           for amenity in property['amenities'][:AMENITY_CHIPS]),
+        price=property['price'],
+        original_price=ORIGINAL_PRICE.format(original_price=property['original_price']) if discount else "",
+        bedrooms=property['bedrooms'],
+        bathrooms=property['bathrooms'],
+        guests=property['guests'],
+    )
+
+
+def row_html(properties, matches, cache, version, thumbnails=None):
+    """One HTML block for a grid row of cards; static parts come from ``cache``"""
+    thumbnails_version = getattr(thumbnails, "version", None)
+    cards = []
+    for property, match in zip(properties, matches):
+        static = cache.get_or_compute((version, thumbnails_version, property['id']),
+                                      lambda: static_html(property, thumbnails))
+        cards.append(_fill_card(static=static, match=int(match * 100)))
+    return f"<div class='card-grid'>{''.join(cards)}</div>"
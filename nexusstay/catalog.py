@@ -0,0 +1,200 @@
+"""Columnar property catalog shared by every session of a server process.
+
+The catalog is read once from an Arrow IPC (``.arrow``/``.feather``) or
+Parquet file, converted to compact dtypes and wrapped in an immutable
+``CatalogSnapshot``. The filter code only ever reads from the snapshot, so a
+single copy can be handed to all sessions.
+"""
+
+import hashlib
+import os
+import sys
+from dataclasses import dataclass, field
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from nexusstay.amenities import AmenityIndex
+from nexusstay.geo import GeoIndex
+from nexusstay.query import QueryCompiler
+from nexusstay.search import TextIndex
+from nexusstay.seed import SEED_PROPERTIES
+from nexusstay.semantic import SemanticIndex
+from nexusstay.similar import SimilarityIndex
+
+CATALOG_ENV = "NEXUSSTAY_CATALOG"
+CACHE_ENV = "NEXUSSTAY_CACHE_DIR"
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+DEFAULT_CATALOG_PATH = os.path.join(DATA_DIR, "catalog.parquet")
+
+CATEGORY_COLUMNS = ("type", "location")
+NUMERIC_DTYPES = {
+    "id": np.int32,
+    "price": np.int32,
+    "original_price": np.int32,
+    "rating": np.float32,
+    "reviews": np.int32,
+    "bedrooms": np.int8,
+    "bathrooms": np.int8,
+    "guests": np.int8,
+    "discount": np.int8,
+}
+BOOL_COLUMNS = ("superhost", "instant_book", "popular", "featured")
+# Unlike other numbers, missing coordinates stay NaN (0, 0 is a real place)
+COORDINATE_COLUMNS = ("latitude", "longitude")
+STRING_COLUMNS = ("title", "image", "description")
+
+
+@dataclass(frozen=True, eq=False)
+class CatalogSnapshot:
+    """Read-only view of the catalog; row ids are positions in ``frame``"""
+    frame: pd.DataFrame
+    version: str
+    source: str = field(default="seed")
+
+    def __len__(self):
+        return len(self.frame)
+
+    def rows(self, row_ids):
+        """Materialize the given row ids as a DataFrame slice"""
+        return self.frame.iloc[np.asarray(row_ids, dtype=np.intp)]
+
+    @cached_property
+    def id_index(self):
+        """Listing id -> row id lookup"""
+        return pd.Index(self.frame["id"].to_numpy())
+
+    def rows_for_ids(self, ids):
+        """Row ids for listing ids; -1 where the id is not in the catalog"""
+        return self.id_index.get_indexer(np.asarray(ids, dtype=np.int64))
+
+    @cached_property
+    def amenity_index(self):
+        """Amenity bitset index, built on first use and kept for the snapshot's lifetime"""
+        return AmenityIndex.from_frame(self.frame)
+
+    @cached_property
+    def geo_index(self):
+        """Grid index over listing coordinates for radius, box and nearest queries"""
+        return GeoIndex.from_frame(self.frame)
+
+    @cached_property
+    def text_index(self):
+        """Inverted index over titles, locations, types and amenity names"""
+        return TextIndex.from_snapshot(self)
+
+    @cached_property
+    def semantic_index(self):
+        """Embedding matrix for semantic search, memory-mapped from the cache directory"""
+        return SemanticIndex.for_snapshot(self, cache_dir())
+
+    @cached_property
+    def similarity(self):
+        """Top-N similar listings per row, cached per version and updated incrementally"""
+        return SimilarityIndex.for_snapshot(self, cache_dir())
+
+    @cached_property
+    def query_compiler(self):
+        """Chat query parser over this snapshot's places, types and amenities"""
+        return QueryCompiler(self)
+
+
+def default_path():
+    """Catalog path from the environment, falling back to ``data/catalog.parquet``"""
+    return os.environ.get(CATALOG_ENV, DEFAULT_CATALOG_PATH)
+
+
+def cache_dir():
+    """Directory for derived, memory-mappable index files"""
+    return os.environ.get(CACHE_ENV, os.path.join(DATA_DIR, "cache"))
+
+
+def _read_table(path):
+    """Read an Arrow table, memory-mapping the file where the format allows it"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if path.endswith((".arrow", ".feather", ".ipc")):
+        source = pa.memory_map(path, "r")
+        try:
+            return pa.ipc.open_file(source).read_all()
+        except pa.ArrowInvalid:
+            return pa.ipc.open_stream(source).read_all()
+    return pq.read_table(path, memory_map=True)
+
+
+def _readonly(values):
+    values.flags.writeable = False
+    return values
+
+
+def normalize_frame(frame):
+    """Cast catalog columns to compact dtypes backed by read-only buffers"""
+    frame = frame.reset_index(drop=True)
+    columns = {}
+    for name in frame.columns:
+        column = frame[name]
+        if name in NUMERIC_DTYPES:
+            column = _readonly(np.asarray(column.fillna(0).to_numpy(), dtype=NUMERIC_DTYPES[name]))
+        elif name in COORDINATE_COLUMNS:
+            column = _readonly(np.asarray(column.to_numpy(dtype=np.float32, na_value=np.nan), dtype=np.float32))
+        elif name in BOOL_COLUMNS:
+            column = _readonly(np.asarray(column.fillna(False).to_numpy(), dtype=bool))
+        elif name in CATEGORY_COLUMNS:
+            categorical = pd.Categorical(column)
+            column = pd.Categorical.from_codes(_readonly(categorical.codes.copy()), categorical.categories)
+        elif name in STRING_COLUMNS:
+            column = column.fillna("").astype(str)
+        elif name == "amenities":
+            column = column.map(lambda values: list(values) if values is not None else [])
+        columns[name] = column
+    return pd.DataFrame(columns, copy=False)
+
+
+def _file_version(path):
+    stat = os.stat(path)
+    digest = hashlib.sha1(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:12]
+
+
+def _records_version(records):
+    digest = hashlib.sha1(repr(records).encode())
+    return digest.hexdigest()[:12]
+
+
+def from_records(records, version=None, source="records"):
+    """Build a snapshot from a list of property dicts"""
+    frame = normalize_frame(pd.DataFrame(records))
+    return CatalogSnapshot(frame, version or _records_version(records), source)
+
+
+def load_catalog(path=None):
+    """Load the catalog file, or the built-in seed listings when none exists"""
+    path = path or default_path()
+    if not os.path.exists(path):
+        return from_records(SEED_PROPERTIES, source="seed")
+    frame = normalize_frame(_read_table(path).to_pandas(split_blocks=True))
+    return CatalogSnapshot(frame, _file_version(path), path)
+
+
+def write_catalog(frame, path):
+    """Write a catalog frame as Arrow IPC or Parquet, chosen by file extension"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    table = pa.Table.from_pandas(normalize_frame(frame), preserve_index=False)
+    if path.endswith((".arrow", ".feather", ".ipc")):
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, path)
+
+
+if __name__ == "__main__":
+    # python -m nexusstay.catalog [path] exports the seed listings to a catalog file
+    target = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CATALOG_PATH
+    write_catalog(pd.DataFrame(SEED_PROPERTIES), target)
+    print(f"Wrote {len(SEED_PROPERTIES)} listings to {target}")
@@ -0,0 +1,146 @@
+"""Rule-based concierge chatbot (No NLTK Required).
+
+The intent table is compiled once per process into a single alternation
+regex with one named group per pattern. One ``finditer`` pass scores every
+intent; the ranking for a normalized input is memoized in an LRU cache.
+When an LLM backend is configured, replies stream from it and the rule
+table is the instant fallback.
+"""
+
+import random
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from nexusstay.llm import BackendError, chat_messages
+
+Intent = namedtuple("Intent", ["name", "confidence", "responses"])
+
+PATTERNS = {
+    'greeting': [
+        (r'hello|hi|hey|hola', ['Hello! Welcome to NexusStay Luxury Retreats! 🏰',
+                               'Hi there! Ready to find your perfect luxury stay?',
+                               'Hey! How can I help you discover elite properties today?']),
+        (r'how are you|how do you do', ['I\'m fantastic! Ready to help you find luxury accommodations!',
+                                      'Doing great! Excited to help you plan your luxury getaway!']),
+    ],
+    'help': [
+        (r'help|support|assistance', ['I can help you with:\n• Finding luxury properties\n• Booking information\n• Price inquiries\n• Amenity details\n• Location recommendations\n\nWhat would you like to know?']),
+    ],
+    'properties': [
+        (r'propert(?:y|ies)|listings?|stays?|accommodations?', ['We have over 1,200 luxury properties worldwide! 🏰\n\n• Luxury Apartments\n• Private Villas\n• Beach Houses\n• Mountain Cabins\n• Historic Castles\n\nWhat type of property interests you?']),
+    ],
+    'pricing': [
+        (r'prices?|pricing|costs?|expensive|cheap|budget', ['Our luxury properties range from $200 to $2,000 per night 💎\n\n• Budget Luxury: $200-400/night\n• Premium: $400-800/night\n• Elite: $800-2,000/night\n\nWhat\'s your preferred budget range?']),
+    ],
+    'amenities': [
+        (r'amenit(?:y|ies)|facilit(?:y|ies)|features?|what included', ['Our properties include premium amenities:\n\n• High-speed WiFi\n• Luxury Kitchens\n• Private Pools\n• Hot Tubs\n• Gym Access\n• Concierge Service\n• Private Beach Access\n\nAny specific amenity you\'re looking for?']),
+    ],
+    'booking': [
+        (r'book(?:ing|ed)?|reserve|reservations?|make reservation|how to book', ['Booking is easy! 🚀\n\n1. Search for properties\n2. Select your dates\n3. Choose guests\n4. Click "Book Now"\n5. Get instant confirmation!\n\nWould you like me to help you find a property?']),
+    ],
+    'location': [
+        (r'locations?|where|places?|destinations?', ['We have luxury properties in 50+ countries! 🌍\n\n• New York City\n• Malibu Beach\n• Paris\n• Tokyo\n• Bali\n• Aspen\n• Edinburgh\n\nWhere would you like to stay?']),
+    ],
+    'cancellation': [
+        (r'cancel(?:led|ling)?|cancellation|refunds?|policy', ['Our cancellation policy:\n\n• Free cancellation within 48 hours\n• 50% refund up to 7 days before\n• Flexible dates available\n• Travel insurance recommended\n\nNeed specific cancellation details?']),
+    ],
+    'thanks': [
+        (r'thank you|thanks|appreciate', ['You\'re welcome! 😊\nHappy to help with your luxury travel plans!',
+                                        'My pleasure! Let me know if you need anything else!']),
+    ],
+    'search': [
+        (r'search|find|look(?:ing)? for', ['I can help you search for properties! 🔍\n\nTry using our search bar above or tell me:\n• Your destination\n• Budget range\n• Number of guests\n• Preferred amenities']),
+    ],
+    'recommendation': [
+        (r'recommend(?:ations?)?|suggest(?:ions?)?|best|top', ['Based on popular choices, I recommend:\n\n🏙️ **City Luxury**: Skyline penthouses in New York\n🏖️ **Beach Getaway**: Private villas in Malibu\n🏔️ **Mountain Escape**: Cozy cabins in Aspen\n🏰 **Unique Stays**: Historic castles in Edinburgh\n\nWhich type interests you?']),
+    ],
+    'default': [
+        (r'.*', ["I'm here to help you find the perfect luxury stay! 🏰\n\nTry asking about:\n• Available properties\n• Pricing\n• Locations\n• Amenities\n• Booking process",
+                "I specialize in luxury accommodations! 💎\n\nHow can I assist with:\n• Property search\n• Price ranges\n• Location advice\n• Booking help"]),
+    ]
+}
+
+
+class IntentMatcher:
+    """Single-pass scorer over a whole intent table"""
+
+    def __init__(self, patterns):
+        self.groups = {}
+        alternatives = []
+        for category, entries in patterns.items():
+            if category == 'default':
+                continue
+            for i, (pattern, responses) in enumerate(entries):
+                group = f"{category}__{i}"
+                self.groups[group] = (category, responses)
+                alternatives.append(f"(?P<{group}>{pattern})")
+        self.regex = re.compile(r"\b(?:" + "|".join(alternatives) + r")\b")
+        self.default = patterns['default'][0][1]
+
+    def rank(self, text):
+        """Intents matched in ``text``, best first, with confidences summing to 1"""
+        scores = {}
+        for match in self.regex.finditer(text):
+            # Longer matches are more specific, so they weigh more
+            scores[match.lastgroup] = scores.get(match.lastgroup, 0) + len(match.group())
+        total = sum(scores.values())
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        return [Intent(self.groups[group][0], score / total, self.groups[group][1]) for group, score in ranked]
+
+
+MATCHER = IntentMatcher(PATTERNS)
+
+
+@lru_cache(maxsize=4096)
+def rank_intents(normalized_text):
+    """Memoized ranking for already-normalized input"""
+    return tuple(MATCHER.rank(normalized_text))
+
+
+class NexusStayChatbot:
+    def __init__(self, matcher=MATCHER, backend=None):
+        self.patterns = PATTERNS
+        self.matcher = matcher
+        self.backend = backend
+
+    def preprocess_text(self, text):
+        """Basic text preprocessing without NLTK"""
+        text = text.lower().strip()
+        text = re.sub(r'[^\w\s]', '', text)
+        return " ".join(text.split())
+
+    def rank(self, user_input):
+        """Ranked intents for raw user input"""
+        normalized = self.preprocess_text(user_input)
+        if self.matcher is MATCHER:
+            return list(rank_intents(normalized))
+        return self.matcher.rank(normalized)
+
+    def rule_response(self, user_input):
+        """Canned reply for the best-ranked intent"""
+        ranked = self.rank(user_input)
+        if ranked:
+            return random.choice(ranked[0].responses)
+        return random.choice(self.matcher.default)
+
+    def stream_response(self, user_input, history=()):
+        """Reply chunks from the backend, or the rule reply if it fails before its first token
+
+        A failure mid-reply keeps the text streamed so far.
+        """
+        if self.backend is not None:
+            started = False
+            try:
+                for chunk in self.backend.stream(chat_messages(history, user_input)):
+                    started = True
+                    yield chunk
+            except BackendError:
+                pass
+            if started:
+                return
+        yield self.rule_response(user_input)
+
+    def get_response(self, user_input, history=()):
+        """Get chatbot response based on user input"""
+        return "".join(self.stream_response(user_input, history))
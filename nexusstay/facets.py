@@ -0,0 +1,61 @@
+"""Sidebar facet counts from one pass over the filter result.
+
+Each count answers "how many stays would match if this option were picked",
+so it applies every current filter except the facet's own.
+``FilterPipeline.facet_rows`` returns the rows that miss at most one facet
+predicate and tags each with that predicate. Every facet then counts its
+rows (full matches plus the rows missing only that facet) with a single
+``bincount`` over the row ids. Amenities are an AND filter, so their counts
+are taken over the full matches ("results that also have it").
+``price_histogram_html`` draws the price buckets under the price slider.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from nexusstay.filters import TOP_RATED
+
+FACETS = ("types", "price", "superhost", "instant_book", "top_rated")
+PRICE_BUCKET = 100
+PRICE_MAX = 2000
+
+Facets = namedtuple("Facets", "total types amenities flags prices")
+
+
+def facet_counts(snapshot, pipeline):
+    """Counts per type, amenity, feature flag and ``PRICE_BUCKET`` price bucket for the pipeline's last state"""
+    rows, failing = pipeline.facet_rows(FACETS)
+
+    def counted(name):
+        missed = failing == FACETS.index(name)
+        return rows[(failing == -1) | missed]
+
+    frame = snapshot.frame
+    results = rows[failing == -1]
+    types = frame["type"].array
+    codes = types.codes[counted("types")]
+    by_type = np.bincount(codes[codes >= 0], minlength=len(types.categories))
+    flags = {name: int(np.count_nonzero(frame[name].to_numpy()[counted(name)])) for name in ("superhost", "instant_book")}
+    flags["top_rated"] = int(np.count_nonzero(frame["rating"].to_numpy()[counted("top_rated")] >= TOP_RATED))
+    buckets = np.minimum(frame["price"].to_numpy()[counted("price")], PRICE_MAX - 1) // PRICE_BUCKET
+    prices = np.bincount(buckets.astype(np.intp), minlength=PRICE_MAX // PRICE_BUCKET)
+    return Facets(
+        total=len(results),
+        types=dict(zip(types.categories, by_type.tolist())),
+        amenities=dict(zip(snapshot.amenity_index.vocabulary, snapshot.amenity_index.counts(results).tolist())),
+        flags=flags,
+        prices=prices.tolist(),
+    )
+
+
+def price_histogram_html(prices, low, high):
+    """Bar strip of the price buckets, with the buckets inside ``low``..``high`` highlighted"""
+    top = max(max(prices), 1)
+    bars = "".join(
+        f"<div title='${index * PRICE_BUCKET:,}+: {count:,}' style='flex: 1; height: {max(100 * count // top, 2)}%; "
+        f"background: {'#00D4AA' if low < (index + 1) * PRICE_BUCKET and index * PRICE_BUCKET <= high else 'var(--border)'}; "
+        f"border-radius: 2px 2px 0 0;'></div>"
+        for index, count in enumerate(prices)
+    )
+    return f"<div style='display: flex; align-items: flex-end; gap: 2px; height: 48px; margin: -0.5rem 0 1rem 0;'>{bars}</div>"
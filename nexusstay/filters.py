@@ -0,0 +1,285 @@
+"""Sidebar and search filters as a set of vectorized predicates.
+
+``FilterState`` is the canonical, hashable form of every filter input.
+Each predicate turns one of its fields into a boolean row mask (or ``None``
+when it does not constrain anything). A session's ``FilterPipeline`` keeps
+the last mask of every predicate bit-packed, so moving one control only
+recomputes that predicate before the masks are ANDed. Results are kept as
+compact ``int32`` row-id arrays in a process-wide LRU ``ResultCache`` keyed
+by the catalog version and the filter state.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from nexusstay.search import tokenize
+
+TOP_RATED = np.float32(4.9)
+
+
+@dataclass(frozen=True)
+class FilterState:
+    price: tuple = (0, 2000)
+    types: tuple = ()
+    rating: float = 0.0
+    amenities: tuple = ()
+    search: tuple = ("", False)
+    guests: int = 1
+    stay: tuple = None
+    featured: bool = False
+    popular: bool = False
+    superhost: bool = False
+    instant_book: bool = False
+    top_rated: bool = False
+    locations: tuple = ()
+    # (latitude, longitude, radius km) or None
+    near: tuple = None
+
+    @classmethod
+    def from_inputs(cls, price, types, rating, amenities, query, semantic, guests, check_in, check_out,
+                    availability_generation, featured, popular, superhost, instant_book, top_rated, locations=(),
+                    near=None):
+        """Normalize raw widget values so equivalent inputs share one key"""
+        query = " ".join(tokenize(query or ""))
+        stay = (check_in, check_out, availability_generation) if check_out > check_in else None
+        return cls(
+            price=(int(price[0]), int(price[1])),
+            types=tuple(sorted(types)),
+            rating=round(float(rating), 2),
+            amenities=tuple(sorted(amenities)),
+            search=(query, bool(semantic and query)),
+            guests=int(guests),
+            stay=stay,
+            featured=bool(featured),
+            popular=bool(popular),
+            superhost=bool(superhost),
+            instant_book=bool(instant_book),
+            top_rated=bool(top_rated),
+            locations=tuple(sorted(locations)),
+            near=(round(float(near[0]), 4), round(float(near[1]), 4), float(near[2])) if near else None,
+        )
+
+
+# --- PREDICATES: (snapshot, field value, availability) -> mask or None ---
+def _price(snapshot, value, availability):
+    price = snapshot.frame["price"].to_numpy()
+    return (price >= value[0]) & (price <= value[1])
+
+
+def _category(name, match_all_when_empty):
+    def predicate(snapshot, value, availability):
+        if not value and match_all_when_empty:
+            return None
+        column = snapshot.frame[name].array
+        # One extra False slot so missing values (code -1) never match
+        wanted = np.zeros(len(column.categories) + 1, dtype=bool)
+        positions = column.categories.get_indexer(list(value))
+        wanted[positions[positions >= 0]] = True
+        return wanted[column.codes]
+    return predicate
+
+
+def _rating(snapshot, value, availability):
+    return snapshot.frame["rating"].to_numpy() >= np.float32(value)
+
+
+def _amenities(snapshot, value, availability):
+    return snapshot.amenity_index.has_all(value) if value else None
+
+
+def _search(snapshot, value, availability):
+    query, semantic = value
+    if not query:
+        return None
+    if semantic:
+        mask = np.zeros(len(snapshot), dtype=bool)
+        mask[snapshot.semantic_index.matches(query)[0]] = True
+        return mask
+    return snapshot.text_index.mask(query)
+
+
+def _near(snapshot, value, availability):
+    return snapshot.geo_index.mask(*value, len(snapshot)) if value else None
+
+
+def _guests(snapshot, value, availability):
+    return snapshot.frame["guests"].to_numpy() >= value if value > 1 else None
+
+
+def _stay(snapshot, value, availability):
+    if value is None or availability is None:
+        return None
+    return availability.available(value[0], value[1])
+
+
+def _flag(column):
+    def predicate(snapshot, value, availability):
+        return snapshot.frame[column].to_numpy() if value else None
+    return predicate
+
+
+def _top_rated(snapshot, value, availability):
+    return snapshot.frame["rating"].to_numpy() >= TOP_RATED if value else None
+
+
+PREDICATES = {
+    "price": _price,
+    # The sidebar lists every type, so no type ticked means no results
+    "types": _category("type", match_all_when_empty=False),
+    "rating": _rating,
+    "amenities": _amenities,
+    "search": _search,
+    "guests": _guests,
+    "stay": _stay,
+    "featured": _flag("featured"),
+    "popular": _flag("popular"),
+    "superhost": _flag("superhost"),
+    "instant_book": _flag("instant_book"),
+    "top_rated": _top_rated,
+    "locations": _category("location", match_all_when_empty=True),
+    "near": _near,
+}
+
+
+def combine(masks, size):
+    """AND masks together into sorted int32 row ids"""
+    result = np.ones(size, dtype=bool)
+    for mask in masks:
+        if mask is not None:
+            result &= mask
+    return np.flatnonzero(result).astype(np.int32)
+
+
+def evaluate(snapshot, state, availability=None):
+    """Row ids matching every predicate of ``state``"""
+    masks = (predicate(snapshot, getattr(state, name), availability) for name, predicate in PREDICATES.items())
+    return combine(masks, len(snapshot))
+
+
+class FilterPipeline:
+    """Per-session predicate masks, recomputed only when their input changes"""
+
+    def __init__(self):
+        self.version = None
+        self.size = 0
+        self.recomputed = ()
+        self._inputs = {}
+        self._packed = {}
+
+    def evaluate(self, snapshot, state, availability=None):
+        """Row ids matching ``state``, reusing every mask whose input is unchanged"""
+        if snapshot.version != self.version:
+            self.version, self.size = snapshot.version, len(snapshot)
+            self._inputs.clear()
+            self._packed.clear()
+        recomputed = []
+        for name, predicate in PREDICATES.items():
+            value = getattr(state, name)
+            if name in self._inputs and self._inputs[name] == value:
+                continue
+            mask = predicate(snapshot, value, availability)
+            self._packed[name] = None if mask is None else np.packbits(mask)
+            self._inputs[name] = value
+            recomputed.append(name)
+        self.recomputed = tuple(recomputed)
+        return self.rows()
+
+    def rows(self, exclude=()):
+        """AND the cached masks (optionally leaving some predicates out) into row ids"""
+        combined = None
+        for name, packed in self._packed.items():
+            if packed is None or name in exclude:
+                continue
+            combined = packed.copy() if combined is None else np.bitwise_and(combined, packed, out=combined)
+        if combined is None:
+            return np.arange(self.size, dtype=np.int32)
+        return np.flatnonzero(np.unpackbits(combined, count=self.size)).astype(np.int32)
+
+    def facet_rows(self, facets):
+        """(rows, index of the one facet each row misses or -1) for rows missing at most one of ``facets``"""
+        base = np.packbits(np.ones(self.size, dtype=bool))
+        for name, packed in self._packed.items():
+            if packed is not None and name not in facets:
+                np.bitwise_and(base, packed, out=base)
+        # Packed per-facet misses, with running "missed one" / "missed two or more" bit sets
+        missed = {name: base & ~self._packed[name] for name in facets if self._packed.get(name) is not None}
+        once, twice = np.zeros_like(base), np.zeros_like(base)
+        for bits in missed.values():
+            twice |= once & bits
+            once |= bits
+        kept = base & ~twice
+        failing = np.full(self.size, -1, dtype=np.int8)
+        for name, bits in missed.items():
+            failing[np.unpackbits(bits & kept, count=self.size).view(bool)] = facets.index(name)
+        rows = np.flatnonzero(np.unpackbits(kept, count=self.size)).astype(np.int32)
+        return rows, failing[rows]
+
+    def nbytes(self):
+        return sum(packed.nbytes for packed in self._packed.values() if packed is not None)
+
+
+def _nbytes(value):
+    return getattr(value, "nbytes", None) or sys.getsizeof(value)
+
+
+class ResultCache:
+    """Thread-safe LRU of filter results with a memory cap"""
+
+    def __init__(self, max_bytes=64 << 20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= _nbytes(previous)
+            self._entries[key] = value
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= _nbytes(evicted)
+        return value
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
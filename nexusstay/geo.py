@@ -0,0 +1,187 @@
+"""Spatial lookups for location-aware search.
+
+Listings carry ``latitude`` / ``longitude`` columns. Catalogs without them
+fall back to the coordinates of their ``location`` in ``PLACES``. The
+``GeoIndex`` buckets rows into a fixed grid of ``CELL_DEGREES`` cells.
+Rows are sorted by cell key, so each latitude band of a bounding box is
+one contiguous slice found by binary search. Only those candidates are
+checked exactly. Radius queries check a vectorized haversine distance, and
+nearest-k widens the radius until it holds ``k`` listings.
+"""
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+KM_PER_MILE = 1.609344
+CELL_DEGREES = 0.25
+COLUMNS = int(360 / CELL_DEGREES)
+DEFAULT_RADIUS_KM = 50
+NEAREST_START_KM = 25
+
+# Place -> (latitude, longitude) of its center: every catalog destination plus a few gateway cities
+PLACES = {
+    "Manhattan, New York": (40.7831, -73.9712), "Brooklyn, New York": (40.6782, -73.9442),
+    "New York, New York": (40.7128, -74.0060), "Boston, Massachusetts": (42.3601, -71.0589),
+    "Malibu, California": (34.0259, -118.7798), "Los Angeles, California": (34.0522, -118.2437),
+    "San Francisco, California": (37.7749, -122.4194), "Lake Tahoe, California": (39.0968, -120.0324),
+    "San Diego, California": (32.7157, -117.1611), "Las Vegas, Nevada": (36.1699, -115.1398),
+    "Aspen, Colorado": (39.1911, -106.8175), "Vail, Colorado": (39.6403, -106.3742),
+    "Denver, Colorado": (39.7392, -104.9903), "Chicago, Illinois": (41.8781, -87.6298),
+    "Miami, Florida": (25.7617, -80.1918), "Key West, Florida": (24.5551, -81.7800),
+    "Orlando, Florida": (28.5383, -81.3792), "Austin, Texas": (30.2672, -97.7431),
+    "Honolulu, Hawaii": (21.3069, -157.8583), "Maui, Hawaii": (20.7984, -156.3319),
+    "Seattle, Washington": (47.6062, -122.3321), "Jackson Hole, Wyoming": (43.4799, -110.7624),
+    "Nashville, Tennessee": (36.1627, -86.7816), "Charleston, South Carolina": (32.7765, -79.9311),
+    "Edinburgh, Scotland": (55.9533, -3.1883), "Glasgow, Scotland": (55.8642, -4.2518),
+    "Scottish Highlands, Scotland": (57.1200, -4.7100), "London, England": (51.5074, -0.1278),
+    "Cotswolds, England": (51.8330, -1.8433), "Paris, France": (48.8566, 2.3522),
+    "Provence, France": (43.9352, 6.0679), "Chamonix, France": (45.9237, 6.8694),
+    "Nice, France": (43.7102, 7.2620), "Barcelona, Spain": (41.3851, 2.1734),
+    "Madrid, Spain": (40.4168, -3.7038), "Ibiza, Spain": (38.9067, 1.4206),
+    "Lisbon, Portugal": (38.7223, -9.1393), "Algarve, Portugal": (37.0179, -7.9304),
+    "Rome, Italy": (41.9028, 12.4964), "Florence, Italy": (43.7696, 11.2558),
+    "Milan, Italy": (45.4642, 9.1900), "Amalfi Coast, Italy": (40.6333, 14.6029),
+    "Tuscany, Italy": (43.7711, 11.2486), "Lake Como, Italy": (46.0160, 9.2572),
+    "Athens, Greece": (37.9838, 23.7275), "Santorini, Greece": (36.3932, 25.4615),
+    "Mykonos, Greece": (37.4467, 25.3289), "Zermatt, Switzerland": (46.0207, 7.7491),
+    "Geneva, Switzerland": (46.2044, 6.1432), "Vienna, Austria": (48.2082, 16.3738),
+    "Berlin, Germany": (52.5200, 13.4050), "Amsterdam, Netherlands": (52.3676, 4.9041),
+    "Reykjavik, Iceland": (64.1466, -21.9426), "Dubrovnik, Croatia": (42.6507, 18.0944),
+    "Tokyo, Japan": (35.6762, 139.6503), "Kyoto, Japan": (35.0116, 135.7681),
+    "Osaka, Japan": (34.6937, 135.5023), "Niseko, Japan": (42.8048, 140.6874),
+    "Bali, Indonesia": (-8.3405, 115.0920), "Ubud, Bali": (-8.5069, 115.2625),
+    "Seminyak, Bali": (-8.6913, 115.1682), "Phuket, Thailand": (7.8804, 98.3923),
+    "Bangkok, Thailand": (13.7563, 100.5018), "Singapore, Singapore": (1.3521, 103.8198),
+    "Sydney, Australia": (-33.8688, 151.2093), "Melbourne, Australia": (-37.8136, 144.9631),
+    "Queenstown, New Zealand": (-45.0312, 168.6626), "Cape Town, South Africa": (-33.9249, 18.4241),
+    "Marrakech, Morocco": (31.6295, -7.9811), "Dubai, United Arab Emirates": (25.2048, 55.2708),
+    "Maldives, Maldives": (3.2028, 73.2207), "Tulum, Mexico": (20.2114, -87.4654),
+    "Mexico City, Mexico": (19.4326, -99.1332), "Rio de Janeiro, Brazil": (-22.9068, -43.1729),
+    "Banff, Canada": (51.1784, -115.5708), "Vancouver, Canada": (49.2827, -123.1207),
+    "Whistler, Canada": (50.1163, -122.9574), "Toronto, Canada": (43.6532, -79.3832),
+}
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distances in km from one point to arrays of points"""
+    lat, lon = np.radians(lat), np.radians(lon)
+    lats, lons = np.radians(lats.astype(np.float64)), np.radians(lons.astype(np.float64))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+
+def coordinates(frame):
+    """(latitude, longitude) float32 arrays; NaN where neither the columns nor ``PLACES`` know the row"""
+    if "latitude" in frame.columns and "longitude" in frame.columns:
+        lats = frame["latitude"].to_numpy(dtype=np.float32, na_value=np.nan)
+        lons = frame["longitude"].to_numpy(dtype=np.float32, na_value=np.nan)
+    else:
+        lats = np.full(len(frame), np.nan, dtype=np.float32)
+        lons = lats.copy()
+    missing = np.isnan(lats) | np.isnan(lons)
+    if missing.any():
+        locations = frame["location"].array
+        known = np.array([PLACES.get(name, (np.nan, np.nan)) for name in locations.categories],
+                         dtype=np.float32).reshape(-1, 2)
+        known = np.vstack([known, [np.nan, np.nan]])  # code -1: no location
+        codes = locations.codes[missing]
+        lats, lons = lats.copy(), lons.copy()
+        lats[missing], lons[missing] = known[codes, 0], known[codes, 1]
+    return lats, lons
+
+
+def _cells(lats, lons):
+    rows = np.floor((lats + 90) / CELL_DEGREES).astype(np.int64).clip(0, int(180 / CELL_DEGREES) - 1)
+    columns = np.floor((lons + 180) / CELL_DEGREES).astype(np.int64).clip(0, COLUMNS - 1)
+    return rows * COLUMNS + columns
+
+
+class GeoIndex:
+    def __init__(self, lats, lons, keys, order):
+        self.lats = lats
+        self.lons = lons
+        self.keys = keys
+        self.order = order
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Grid index over a catalog frame; rows without coordinates are left out"""
+        lats, lons = coordinates(frame)
+        located = np.flatnonzero(~(np.isnan(lats) | np.isnan(lons)))
+        keys = _cells(lats[located], lons[located])
+        by_cell = np.argsort(keys, kind="stable")
+        return cls(lats, lons, keys[by_cell], located[by_cell].astype(np.int32))
+
+    def __len__(self):
+        return len(self.order)
+
+    def _candidates(self, south, west, north, east):
+        """Rows in the grid cells covering a box (``west > east`` wraps the antimeridian)"""
+        first, last = _cells(np.array([south, north]), np.array([west, east]))
+        band_rows = np.arange(first // COLUMNS, last // COLUMNS + 1)
+        spans = [(first % COLUMNS, last % COLUMNS)] if west <= east else [(first % COLUMNS, COLUMNS - 1), (0, last % COLUMNS)]
+        starts, stops = [], []
+        for low, high in spans:
+            starts.append(np.searchsorted(self.keys, band_rows * COLUMNS + low, side="left"))
+            stops.append(np.searchsorted(self.keys, band_rows * COLUMNS + high, side="right"))
+        starts, stops = np.concatenate(starts), np.concatenate(stops)
+        return np.concatenate([self.order[start:stop] for start, stop in zip(starts, stops)] or [self.order[:0]])
+
+    def bbox(self, south, west, north, east):
+        """Sorted rows inside a latitude / longitude box, e.g. a map viewport"""
+        rows = self._candidates(south, west, north, east)
+        lats, lons = self.lats[rows], self.lons[rows]
+        inside = (lats >= south) & (lats <= north)
+        inside &= ((lons >= west) & (lons <= east)) if west <= east else ((lons >= west) | (lons <= east))
+        return np.sort(rows[inside])
+
+    def radius(self, lat, lon, km):
+        """(sorted rows, distances in km) within ``km`` of a point"""
+        dlat = km / KM_PER_DEGREE
+        south, north = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+        # Longitude span of the circle at its widest latitude; near a pole every longitude is in reach
+        widest = max(abs(south), abs(north))
+        dlon = 180.0 if widest >= 89.9 else dlat / np.cos(np.radians(widest))
+        if dlon >= 180:
+            west, east = -180.0, 180.0
+        else:
+            west, east = (lon - dlon + 180) % 360 - 180, (lon + dlon + 180) % 360 - 180
+        rows = np.sort(self._candidates(south, west, north, east))
+        distances = haversine_km(lat, lon, self.lats[rows], self.lons[rows])
+        inside = distances <= km
+        return rows[inside], distances[inside]
+
+    def mask(self, lat, lon, km, size):
+        """Boolean row mask of listings within ``km`` of a point"""
+        mask = np.zeros(size, dtype=bool)
+        mask[self.radius(lat, lon, km)[0]] = True
+        return mask
+
+    def nearest(self, lat, lon, k):
+        """(rows, distances in km) of the ``k`` closest listings, nearest first"""
+        if k <= 0:
+            return self.order[:0], np.zeros(0)
+        km = NEAREST_START_KM
+        while True:
+            rows, distances = self.radius(lat, lon, km)
+            if len(rows) >= k or km >= np.pi * EARTH_RADIUS_KM:
+                break
+            km *= 4
+        best = np.argpartition(distances, k - 1)[:k] if len(rows) > k else np.arange(len(rows))
+        best = best[np.argsort(distances[best], kind="stable")]
+        return rows[best], distances[best]
+
+    def center(self, location, frame):
+        """(lat, lon) of a place: its ``PLACES`` entry, else the median of its listings; None if unknown"""
+        if location in PLACES:
+            return PLACES[location]
+        column = frame["location"].array
+        code = column.categories.get_indexer([location])[0]
+        if code < 0:
+            return None
+        members = np.flatnonzero(column.codes == code)
+        members = members[~np.isnan(self.lats[members])]
+        if not len(members):
+            return None
+        return float(np.median(self.lats[members])), float(np.median(self.lons[members]))
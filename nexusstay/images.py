@@ -0,0 +1,180 @@
+"""Local thumbnails for card and destination images.
+
+``ingest`` reads source images from local files, resizes each one (cover
+crop) to every display size in ``VARIANTS`` and encodes WebP and/or JPEG.
+Output goes to a content-addressed cache under ``static/thumbs``. A file is
+named by the SHA-256 of its source bytes plus size and quality, so re-running
+only encodes new or changed images. Sources are decoded in a process pool,
+one task per source covering all of its variants.
+
+Streamlit serves ``static/`` at ``app/static/`` (``enableStaticServing`` in
+``.streamlit/config.toml``). ``ThumbnailManifest`` maps the image
+references used by the catalog (URLs or file names) to those files and falls
+back to the original reference for images that were never ingested (asking
+resizing CDNs such as Unsplash for the display size instead of the original).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_DIR = os.path.join(ROOT, "data", "images")
+STATIC_DIR = os.path.join(ROOT, "static")
+MANIFEST_NAME = "manifest.json"
+STATIC_URL = "app/static/"
+# Image CDNs that resize on request; used for references that were never ingested
+RESIZING_HOSTS = ("images.unsplash.com",)
+# Optional {reference (e.g. a hotlinked URL): file name in the source directory}
+SOURCE_MAP_NAME = "sources.json"
+
+# Rendered at about 1.5x the CSS size of the tile (card image 240px high, destination 120px)
+VARIANTS = {"card": (600, 360), "destination": (480, 180)}
+FORMATS = {"webp": ("WEBP", {"quality": 75, "method": 4}), "jpeg": ("JPEG", {"quality": 80, "optimize": True, "progressive": True})}
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff")
+
+
+def _digest(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def thumbnail_path(digest, size, fmt):
+    """Cache path (relative to ``static/``) for a source hash, size and format"""
+    width, height = size
+    quality = FORMATS[fmt][1]["quality"]
+    return f"thumbs/{digest[:2]}/{digest[:24]}-{width}x{height}q{quality}.{fmt}"
+
+
+def _render(job):
+    """Encode every missing thumbnail for one source; returns (source, {variant: {format: path}}, new bytes)"""
+    source, static_dir, variants, formats = job
+    digest = _digest(source)
+    outputs = {variant: {fmt: thumbnail_path(digest, size, fmt) for fmt in formats} for variant, size in variants.items()}
+    missing = [(variant, fmt) for variant, paths in outputs.items() for fmt, path in paths.items()
+               if not os.path.exists(os.path.join(static_dir, path))]
+    written = 0
+    if missing:
+        from PIL import Image, ImageOps
+
+        with Image.open(source) as image:
+            # JPEG sources decode straight to a reduced scale when the target is much smaller
+            image.draft("RGB", (2 * max(w for w, _ in variants.values()), 2 * max(h for _, h in variants.values())))
+            image = ImageOps.exif_transpose(image).convert("RGB")
+            for variant, fmt in missing:
+                path = os.path.join(static_dir, outputs[variant][fmt])
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                thumb = ImageOps.fit(image, variants[variant], Image.LANCZOS)
+                codec, options = FORMATS[fmt]
+                handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+                with os.fdopen(handle, "wb") as out:
+                    thumb.save(out, codec, **options)
+                os.replace(temporary, path)
+                written += os.path.getsize(path)
+    return source, outputs, written
+
+
+def discover_sources(source_dir=SOURCE_DIR):
+    """{reference: local file} for every image in ``source_dir`` plus the entries of its ``sources.json``"""
+    sources = {}
+    if not os.path.isdir(source_dir):
+        return sources
+    for folder, _, names in os.walk(source_dir):
+        for name in sorted(names):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                path = os.path.join(folder, name)
+                sources[os.path.relpath(path, source_dir).replace(os.sep, "/")] = path
+    mapping = os.path.join(source_dir, SOURCE_MAP_NAME)
+    if os.path.exists(mapping):
+        with open(mapping) as handle:
+            for reference, name in json.load(handle).items():
+                sources[reference] = os.path.join(source_dir, name)
+    return sources
+
+
+def ingest(sources, static_dir=STATIC_DIR, variants=VARIANTS, formats=("webp",), workers=None):
+    """Thumbnail ``sources`` ({reference: path}) in parallel and write the manifest; returns (manifest, stats)"""
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"unsupported thumbnail formats: {', '.join(sorted(unknown))}")
+    files = sorted(set(sources.values()))
+    jobs = [(path, static_dir, variants, tuple(formats)) for path in files]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rendered = {source: (outputs, written) for source, outputs, written in pool.map(_render, jobs, chunksize=4)}
+    images = {reference: rendered[path][0] for reference, path in sorted(sources.items())}
+    manifest = {
+        "version": hashlib.sha256(json.dumps(images, sort_keys=True).encode()).hexdigest()[:16],
+        "variants": {name: list(size) for name, size in variants.items()},
+        "images": images,
+    }
+    path = os.path.join(static_dir, "thumbs", MANIFEST_NAME)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as handle:
+        json.dump(manifest, handle, indent=1)
+    stats = {
+        "sources": len(files),
+        "source_bytes": sum(os.path.getsize(source) for source in files),
+        "written_bytes": sum(written for _, written in rendered.values()),
+        "encoded": sum(1 for _, written in rendered.values() if written),
+    }
+    return manifest, stats
+
+
+def remote_thumbnail(reference, size):
+    """``reference`` resized by its CDN when the host supports it, else unchanged"""
+    parts = urlsplit(reference)
+    if parts.hostname not in RESIZING_HOSTS:
+        return reference
+    query = dict(parse_qsl(parts.query))
+    query.update(w=str(size[0]), h=str(size[1]), fit="crop", auto="format", q="75")
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class ThumbnailManifest:
+    """Reference -> served thumbnail URL, with the original reference as fallback"""
+
+    def __init__(self, images=None, version="none", variants=VARIANTS, preferred=("webp", "jpeg")):
+        self.images = images or {}
+        self.version = version
+        self.variants = {name: tuple(size) for name, size in variants.items()}
+        self.preferred = preferred
+
+    def __len__(self):
+        return len(self.images)
+
+    @classmethod
+    def load(cls, static_dir=STATIC_DIR):
+        path = os.path.join(static_dir, "thumbs", MANIFEST_NAME)
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as handle:
+            manifest = json.load(handle)
+        return cls(manifest["images"], manifest["version"], manifest["variants"])
+
+    def url(self, reference, variant):
+        formats = self.images.get(reference, {}).get(variant)
+        if formats:
+            for fmt in self.preferred:
+                if fmt in formats:
+                    return STATIC_URL + formats[fmt]
+        return remote_thumbnail(reference, self.variants[variant])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build card and destination thumbnails from local source images")
+    parser.add_argument("--sources", default=SOURCE_DIR, help="directory of source images (and optional sources.json)")
+    parser.add_argument("--static", default=STATIC_DIR, help="Streamlit static directory to write thumbs/ into")
+    parser.add_argument("--formats", default="webp", help="comma-separated: " + ", ".join(FORMATS))
+    parser.add_argument("--workers", type=int, help="processes (default: one per CPU)")
+    args = parser.parse_args()
+    manifest, stats = ingest(discover_sources(args.sources), args.static, formats=args.formats.split(","), workers=args.workers)
+    print(f"{len(manifest['images'])} references from {stats['sources']} sources ({stats['source_bytes'] / 1e6:.1f} MB); "
+          f"encoded {stats['encoded']} ({stats['written_bytes'] / 1e6:.2f} MB new), manifest {manifest['version']}")
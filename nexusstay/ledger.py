@@ -0,0 +1,194 @@
+"""Durable booking ledger on SQLite.
+
+Bookings are compact rows (property id, dates, guests, nightly price) in a
+WAL-mode database. Reads borrow connections from a small pool shared by all
+sessions; writes go through a single writer thread that drains a queue and
+commits each batch in one ``BEGIN IMMEDIATE`` transaction. The overlap
+check runs inside that transaction, so two sessions (or two server
+processes) can never book the same nights, and a burst of clicks costs one
+fsync per batch instead of one per booking.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import date
+
+LEDGER_ENV = "NEXUSSTAY_LEDGER"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    id INTEGER PRIMARY KEY,
+    property_id INTEGER NOT NULL,
+    check_in INTEGER NOT NULL,
+    check_out INTEGER NOT NULL,
+    guests INTEGER NOT NULL,
+    price INTEGER NOT NULL,
+    session TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bookings_property_dates ON bookings (property_id, check_in, check_out);
+"""
+
+Booking = namedtuple("Booking", ["id", "property_id", "check_in", "check_out", "guests", "price"])
+BookingResult = namedtuple("BookingResult", ["booking_id", "reason"])
+
+_Request = namedtuple("_Request", ["property_id", "check_in", "check_out", "guests", "price", "session", "future"])
+
+
+def default_path():
+    """Ledger path from the environment, falling back to ``data/bookings.db``"""
+    return os.environ.get(LEDGER_ENV, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "bookings.db"))
+
+
+def _booking(row):
+    return Booking(row[0], row[1], date.fromordinal(row[2]), date.fromordinal(row[3]), row[4], row[5])
+
+
+class BookingLedger:
+    def __init__(self, path=None, pool_size=4, batch_size=64, batch_wait=0.005):
+        self.path = path or default_path()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.batches = 0
+        self.committed = 0
+
+        self._writer_conn = self._connect()
+        self._writer_conn.executescript(SCHEMA)
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        self._requests = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="booking-ledger-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled read connection"""
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    # --- Writes ---
+    def submit(self, property_id, check_in, check_out, guests, price, session=None):
+        """Queue a booking; the returned future resolves to a ``BookingResult``"""
+        future = Future()
+        if self._closed:
+            future.set_exception(RuntimeError("booking ledger is closed"))
+            return future
+        if check_out <= check_in:
+            future.set_result(BookingResult(None, "Check-out must be after check-in"))
+            return future
+        self._requests.put(_Request(int(property_id), check_in.toordinal(), check_out.toordinal(),
+                                    int(guests), int(price), session, future))
+        return future
+
+    def book(self, property_id, check_in, check_out, guests, price, session=None, timeout=10.0):
+        """Book and wait for the batch holding this request to commit"""
+        return self.submit(property_id, check_in, check_out, guests, price, session).result(timeout)
+
+    def _drain(self):
+        batch = [self._requests.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_loop(self):
+        while True:
+            drained = self._drain()
+            batch = [request for request in drained if request is not None]
+            if batch:
+                self._commit(batch)
+            if len(batch) < len(drained):
+                return
+
+    def _commit(self, batch):
+        conn = self._writer_conn
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for request in batch:
+                clash = conn.execute(
+                    "SELECT 1 FROM bookings WHERE property_id = ? AND check_in < ? AND check_out > ? LIMIT 1",
+                    (request.property_id, request.check_out, request.check_in),
+                ).fetchone()
+                if clash:
+                    results.append(BookingResult(None, "Those dates are already booked"))
+                    continue
+                cursor = conn.execute(
+                    "INSERT INTO bookings (property_id, check_in, check_out, guests, price, session, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (request.property_id, request.check_in, request.check_out, request.guests,
+                     request.price, request.session, time.time()),
+                )
+                results.append(BookingResult(cursor.lastrowid, None))
+            conn.execute("COMMIT")
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for request in batch:
+                request.future.set_exception(exc)
+            return
+        self.batches += 1
+        self.committed += sum(result.booking_id is not None for result in results)
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
+
+    def close(self):
+        """Flush queued bookings and stop the writer"""
+        if self._closed:
+            return
+        self._closed = True
+        self._requests.put(None)
+        self._writer.join()
+        self._writer_conn.close()
+        while not self._pool.empty():
+            self._pool.get().close()
+
+    # --- Reads ---
+    def get(self, booking_ids):
+        """Bookings by id, in the order given; unknown ids are skipped"""
+        booking_ids = [int(booking_id) for booking_id in booking_ids]
+        if not booking_ids:
+            return []
+        placeholders = ",".join("?" * len(booking_ids))
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"SELECT id, property_id, check_in, check_out, guests, price FROM bookings WHERE id IN ({placeholders})",
+                booking_ids,
+            ).fetchall()
+        by_id = {row[0]: _booking(row) for row in rows}
+        return [by_id[booking_id] for booking_id in booking_ids if booking_id in by_id]
+
+    def blocked_stays(self, since=None):
+        """(property_id, check_in, check_out) of every stay ending after ``since``"""
+        since = (since or date.min).toordinal()
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT property_id, check_in, check_out FROM bookings WHERE check_out > ?", (since,)
+            ).fetchall()
+        return [(property_id, date.fromordinal(check_in), date.fromordinal(check_out))
+                for property_id, check_in, check_out in rows]
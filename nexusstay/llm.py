@@ -0,0 +1,200 @@
+"""Streaming chat backends for the concierge.
+
+A backend turns a list of OpenAI-style chat messages into an iterator of
+text chunks. ``OpenAIBackend`` talks to any OpenAI-compatible
+``/chat/completions`` endpoint over pooled keep-alive connections, with a
+socket timeout on every read, a total deadline per reply and a process-wide
+cap on generations in flight. It is configured from the environment; without ``NEXUSSTAY_LLM_URL``
+the rule-based replies are used on their own.
+"""
+
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+URL_ENV = "NEXUSSTAY_LLM_URL"
+MODEL_ENV = "NEXUSSTAY_LLM_MODEL"
+API_KEY_ENV = "NEXUSSTAY_LLM_API_KEY"
+TIMEOUT_ENV = "NEXUSSTAY_LLM_TIMEOUT"
+DEADLINE_ENV = "NEXUSSTAY_LLM_DEADLINE"
+MAX_INFLIGHT_ENV = "NEXUSSTAY_LLM_MAX_INFLIGHT"
+
+SYSTEM_PROMPT = (
+    "You are the NexusStay concierge for a luxury vacation rental marketplace. "
+    "Answer briefly and warmly, and help guests find, compare and book properties."
+)
+HISTORY_MESSAGES = 8
+
+
+class BackendError(Exception):
+    """The backend could not produce (the rest of) a reply"""
+
+
+class BackendBusy(BackendError):
+    """Every generation slot is taken"""
+
+
+class _StaleConnection(Exception):
+    pass
+
+
+def chat_messages(history, user_input, system_prompt=SYSTEM_PROMPT):
+    """OpenAI-style messages from the app's chat history plus the new turn"""
+    messages = [{"role": "system", "content": system_prompt}]
+    for message in list(history)[-HISTORY_MESSAGES:]:
+        role = "assistant" if message["role"] == "bot" else "user"
+        messages.append({"role": role, "content": message["content"]})
+    messages.append({"role": "user", "content": user_input})
+    return messages
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, reused most-recent first"""
+
+    def __init__(self, url, size=8, timeout=15.0):
+        parts = urlsplit(url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = queue.LifoQueue(maxsize=size)
+        # Session threads open connections concurrently; keeps the reuse count exact
+        self._count_lock = threading.Lock()
+
+    def _open(self):
+        connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        with self._count_lock:
+            self.opened += 1
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it goes back to the pool only if the body was fully read"""
+        try:
+            conn, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            conn, reused = self._open(), False
+        try:
+            yield conn, reused
+        except BaseException:
+            conn.close()
+            raise
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+class OpenAIBackend:
+    def __init__(self, url, model, api_key=None, timeout=15.0, max_inflight=4, pool_size=8,
+                 temperature=0.7, max_tokens=400, deadline=60.0):
+        self.model = model
+        # Seconds a whole reply may take, so a server trickling tokens cannot hold a slot indefinitely
+        self.deadline = deadline
+        self.api_key = api_key
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.pool = ConnectionPool(url, size=pool_size, timeout=timeout)
+        self._slots = threading.BoundedSemaphore(max_inflight)
+
+    def _headers(self):
+        headers = {"Content-Type": "application/json", "Accept": "text/event-stream"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def _send(self, conn, body):
+        if conn.sock is not None:
+            # A reused connection may still carry the shortened timeout of a reply near its deadline
+            conn.sock.settimeout(self.pool.timeout)
+        conn.request("POST", f"{self.pool.path}/chat/completions", body, self._headers())
+        response = conn.getresponse()
+        if response.status != 200:
+            detail = response.read(500).decode("utf-8", "replace")
+            raise BackendError(f"HTTP {response.status}: {detail}")
+        return response
+
+    def stream(self, messages):
+        """Yield reply text as the server streams it"""
+        if not self._slots.acquire(blocking=False):
+            raise BackendBusy("too many generations in flight")
+        try:
+            body = json.dumps({
+                "model": self.model,
+                "messages": messages,
+                "stream": True,
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens,
+            }).encode()
+            yield from self._stream(body, time.monotonic() + self.deadline)
+        finally:
+            self._slots.release()
+
+    def _stream(self, body, deadline):
+        for attempt in range(2):
+            try:
+                with self.pool.connection() as (conn, reused):
+                    try:
+                        response = self._send(conn, body)
+                    except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                        # The server may have dropped an idle keep-alive connection
+                        if reused and not attempt:
+                            raise _StaleConnection()
+                        raise
+                    yield from _events(response, conn, deadline, self.pool.timeout)
+                    return
+            except _StaleConnection:
+                continue
+            except (OSError, http.client.HTTPException, ValueError) as exc:
+                raise BackendError(str(exc)) from exc
+
+
+def _events(response, conn, deadline, timeout):
+    """Text deltas from a server-sent event stream, read to the end before ``deadline``"""
+    done = False
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise BackendError("reply deadline exceeded")
+        if conn.sock is not None:
+            conn.sock.settimeout(min(timeout, remaining))
+        line = response.readline()
+        if not line:
+            break
+        line = line.strip()
+        if done or not line.startswith(b"data:"):
+            continue
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            done = True
+            continue
+        for choice in json.loads(data).get("choices", ()):
+            text = (choice.get("delta") or {}).get("content")
+            if text:
+                yield text
+
+
+def backend_from_env():
+    """``OpenAIBackend`` configured from the environment, or None when no URL is set"""
+    url = os.environ.get(URL_ENV)
+    if not url:
+        return None
+    return OpenAIBackend(
+        url,
+        os.environ.get(MODEL_ENV, "gpt-4o-mini"),
+        api_key=os.environ.get(API_KEY_ENV),
+        timeout=float(os.environ.get(TIMEOUT_ENV, 15)),
+        deadline=float(os.environ.get(DEADLINE_ENV, 60)),
+        max_inflight=int(os.environ.get(MAX_INFLIGHT_ENV, 4)),
+    )
@@ -0,0 +1,51 @@
+"""Sorting and paging of filtered results.
+
+Only row ids are sorted and sliced here; the caller materializes the visible
+page from the catalog, so off-screen listings never become cards.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from nexusstay.ranking import top_k
+
+PAGE_SIZES = (9, 18, 36)
+
+# label -> (column, ascending); None orders by relevance score
+SORT_OPTIONS = {
+    "AI Recommended": None,
+    "Price: Low to High": ("price", True),
+    "Price: High to Low": ("price", False),
+    "Top Rated": ("rating", False),
+    "Most Reviewed": ("reviews", False),
+}
+
+Page = namedtuple("Page", ["number", "pages", "start", "stop"])
+
+
+def sort_positions(frame, rows, option, scores=None, limit=None):
+    """Order candidates by a sort option, as positions into ``rows``
+
+    Relevance ordering only ranks the first ``limit`` positions (the pages
+    shown so far); column sorts are stable, so ties keep catalog order.
+    """
+    rows = np.asarray(rows)
+    spec = SORT_OPTIONS.get(option)
+    if spec is None:
+        if scores is None:
+            return np.arange(len(rows))
+        return top_k(scores, len(rows) if limit is None else limit)
+    column, ascending = spec
+    values = frame[column].to_numpy()[rows]
+    if not ascending:
+        values = -values.astype(np.float64)
+    return np.argsort(values, kind="stable")
+
+
+def page_bounds(total, number, page_size):
+    """Clamp a page number and return the slice it covers"""
+    pages = max(1, -(-total // page_size))
+    number = min(max(number, 0), pages - 1)
+    start = number * page_size
+    return Page(number, pages, start, min(start + page_size, total))
@@ -0,0 +1,313 @@
+"""Personal "AI Match" from wishlist and booking signals.
+
+Wishlist adds, removals and bookings are appended to an SQLite interaction
+log as (user, listing, weight) events. ``fit`` factorizes the aggregated
+user x listing matrix offline with implicit-feedback ALS (confidence
+``1 + ALPHA * weight``). ``python -m nexusstay.personalize`` saves the
+listing factors to the cache directory. When no saved model exists, the app fits the
+log once at startup.
+
+Online, a user's vector is folded in against the fixed listing factors
+after each new event: one ``FACTORS`` x ``FACTORS`` solve over that user's
+history, with no refit. ``blend`` mixes the user's affinity (one
+matrix-vector product over the candidate rows) into the relevance scores.
+Users with no signals get listing popularity (summed over the whole log)
+instead. Every ``REFIT_EVERY`` new events the listing factors are refitted
+in a background thread and saved, so a deploy that starts with an empty log
+becomes personal once events arrive. At most ``MAX_USERS`` users are held
+in memory; the rest are reloaded from the log when they return.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+INTERACTIONS_ENV = "NEXUSSTAY_INTERACTIONS"
+MODEL_NAME = "personal.npz"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    property_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    weight REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS interactions_user ON interactions (user);
+"""
+
+# A removal cancels the add; a booking is a stronger signal than a wishlist heart
+EVENT_WEIGHTS = {"wishlist": 1.0, "unwishlist": -1.0, "booking": 3.0}
+FACTORS = 16
+REGULARIZATION = 0.1
+ALPHA = 10.0
+ITERATIONS = 8
+# Share of the final score taken by personal affinity (or popularity)
+BLEND = 0.2
+GATHER_SHARE = 8
+# Visitors whose history and folded-in vector stay in memory; older ones are reloaded from the log
+MAX_USERS = 10_000
+# New events after which the listing factors are refitted in the background (and saved)
+REFIT_EVERY = 50
+
+
+def default_path():
+    """Interaction log path from the environment, falling back to ``data/interactions.db``"""
+    return os.environ.get(INTERACTIONS_ENV, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "interactions.db"))
+
+
+class InteractionLog:
+    """Append-only wishlist / booking events, shared by every session"""
+
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def record(self, user, property_id, kind):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO interactions (user, property_id, kind, weight, created_at) VALUES (?, ?, ?, ?, ?)",
+                (user, int(property_id), kind, EVENT_WEIGHTS[kind], time.time()),
+            )
+
+    def totals(self):
+        """Net positive weight per (user, property_id) as a DataFrame"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user, property_id, SUM(weight) FROM interactions GROUP BY user, property_id HAVING SUM(weight) > 0"
+            ).fetchall()
+        return pd.DataFrame(rows, columns=["user", "property_id", "weight"])
+
+    def history(self, user):
+        """{property_id: net positive weight} for one user"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT property_id, SUM(weight) FROM interactions WHERE user = ? GROUP BY property_id HAVING SUM(weight) > 0",
+                (user,),
+            ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        self._conn.close()
+
+
+def _solve(fixed, gram, items, weights, regularization=REGULARIZATION):
+    """Least-squares factor for one user (or listing) with implicit-feedback confidences"""
+    chosen = fixed[items]
+    confidence = ALPHA * weights
+    a = gram + (chosen.T * confidence) @ chosen + regularization * np.eye(fixed.shape[1], dtype=fixed.dtype)
+    b = chosen.T @ (1 + confidence)
+    return np.linalg.solve(a, b)
+
+
+def _sweep(fixed, groups, count):
+    """Solve every row with interactions; rows without any stay at zero"""
+    solved = np.zeros((count, fixed.shape[1]), dtype=np.float32)
+    gram = fixed.T @ fixed
+    for row, (items, weights) in groups.items():
+        solved[row] = _solve(fixed, gram, items, weights)
+    return solved
+
+
+def _groups(keys, values, weights):
+    order = np.argsort(keys, kind="stable")
+    keys, values, weights = keys[order], values[order], weights[order]
+    bounds = np.flatnonzero(np.diff(keys)) + 1
+    return {key[0]: (value, weight) for key, value, weight in
+            zip(np.split(keys, bounds), np.split(values, bounds), np.split(weights, bounds)) if len(key)}
+
+
+def fit(totals, item_count, factors=FACTORS, iterations=ITERATIONS, seed=0):
+    """(user ids, user factors, item factors) from ``totals`` rows of (user, row, weight)"""
+    users, user_rows = np.unique(totals["user"].to_numpy(), return_inverse=True)
+    items = totals["row"].to_numpy().astype(np.intp)
+    weights = totals["weight"].to_numpy().astype(np.float32)
+    by_user = _groups(user_rows, items, weights)
+    by_item = _groups(items, user_rows, weights)
+    rng = np.random.default_rng(seed)
+    item_factors = (rng.standard_normal((item_count, factors)) * 0.01).astype(np.float32)
+    user_factors = np.zeros((len(users), factors), dtype=np.float32)
+    for _ in range(iterations):
+        user_factors = _sweep(item_factors, by_user, len(users))
+        item_factors = _sweep(user_factors, by_item, item_count)
+    return users, user_factors, item_factors
+
+
+def aligned_totals(snapshot, log):
+    """The log's net weights with a ``row`` column, limited to listings in ``snapshot``"""
+    totals = log.totals()
+    totals["row"] = snapshot.rows_for_ids(totals["property_id"].to_numpy())
+    return totals[totals["row"] >= 0]
+
+
+def popularity(snapshot, totals):
+    """Summed net weight per listing row from aligned ``totals``"""
+    return np.bincount(totals["row"].to_numpy().astype(np.intp), totals["weight"].to_numpy(),
+                       minlength=len(snapshot)).astype(np.float32)
+
+
+class Personalizer:
+    """Listing factors and per-user vectors for one catalog snapshot"""
+
+    def __init__(self, snapshot, item_factors, log=None, popularity=None, max_users=MAX_USERS, path=None):
+        self.snapshot = snapshot
+        self.item_factors = item_factors
+        self.gram = item_factors.T @ item_factors
+        # Until a model is fitted every listing factor is zero and only popularity ranks
+        self.trained = bool(np.any(item_factors))
+        self.log = log
+        self.path = path
+        self.pending = 0
+        self.refitting = False
+        self.max_users = max_users
+        # LRU of user -> [{row: net weight}, folded-in vector or None]; a miss reloads the history from the log
+        self.users = OrderedDict()
+        self.popularity = np.zeros(len(snapshot), dtype=np.float32) if popularity is None else popularity
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_snapshot(cls, snapshot, log, cache_dir=None):
+        """Saved factors from ``cache_dir`` when present, else a fit of the current log"""
+        totals = aligned_totals(snapshot, log)
+        path = os.path.join(cache_dir, MODEL_NAME) if cache_dir else None
+        if path and os.path.exists(path):
+            saved = np.load(path)
+            item_factors = np.zeros((len(snapshot), saved["item_factors"].shape[1]), dtype=np.float32)
+            rows = snapshot.rows_for_ids(saved["item_ids"])
+            item_factors[rows[rows >= 0]] = saved["item_factors"][rows >= 0]
+        elif len(totals):
+            item_factors = fit(totals, len(snapshot))[2]
+        else:
+            item_factors = np.zeros((len(snapshot), FACTORS), dtype=np.float32)
+        model = cls(snapshot, item_factors, log, popularity(snapshot, totals), path=path)
+        if not model.trained:
+            logger.warning("personalization inactive: no saved model or interactions to fit; ranking by popularity "
+                           "until %d new events trigger a refit or `python -m nexusstay.personalize` saves %s",
+                           REFIT_EVERY, MODEL_NAME)
+        return model
+
+    def save(self, path):
+        """Write the listing factors, keyed by listing id so a later catalog can reuse them"""
+        np.savez(path, item_ids=self.snapshot.frame["id"].to_numpy(), item_factors=self.item_factors)
+
+    def _entry(self, user):
+        """The user's [history, vector] LRU entry, loaded from the log on a miss (call with the lock held)"""
+        entry = self.users.get(user)
+        if entry is None:
+            history = {}
+            if self.log is not None:
+                saved = self.log.history(user)
+                rows = self.snapshot.rows_for_ids(np.fromiter(saved, dtype=np.int64, count=len(saved)))
+                history = {int(row): float(weight) for row, weight in zip(rows, saved.values()) if row >= 0}
+            entry = self.users[user] = [history, None]
+            while len(self.users) > self.max_users:
+                self.users.popitem(last=False)
+        else:
+            self.users.move_to_end(user)
+        return entry
+
+    def observe(self, user, row, property_id, kind):
+        """Log an event; the user is folded back in on their next scoring"""
+        weight = EVENT_WEIGHTS[kind]
+        with self._lock:
+            entry = self._entry(user)
+            if self.log is not None:
+                self.log.record(user, property_id, kind)
+            rows = entry[0]
+            before = rows.get(row, 0.0)
+            after = max(before + weight, 0.0)
+            if after:
+                rows[row] = after
+            else:
+                rows.pop(row, None)
+            self.popularity[row] += after - before
+            entry[1] = None
+            self.pending += 1
+            refit = self.log is not None and self.pending >= REFIT_EVERY and not self.refitting
+            if refit:
+                self.pending, self.refitting = 0, True
+        if refit:
+            threading.Thread(target=self.refit, name="personalization-refit", daemon=True).start()
+
+    def refit(self):
+        """Refit the listing factors on the whole log, swap them in and save them to ``path``"""
+        try:
+            totals = aligned_totals(self.snapshot, self.log)
+            if not len(totals):
+                return
+            started = time.perf_counter()
+            item_factors = fit(totals, len(self.snapshot))[2]
+            with self._lock:
+                self.item_factors = item_factors
+                self.gram = item_factors.T @ item_factors
+                self.trained = bool(np.any(item_factors))
+                for entry in self.users.values():
+                    entry[1] = None
+            if self.path:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self.save(self.path)
+            logger.info("personalization refitted on %d interactions in %.2fs", len(totals), time.perf_counter() - started)
+        finally:
+            self.refitting = False
+
+    def _vector(self, user):
+        """The user's factor, folded in from their history on first use after a change"""
+        if not self.trained:
+            return None
+        with self._lock:
+            entry = self._entry(user)
+            rows, vector = entry
+            if vector is None and rows:
+                items = np.fromiter(rows, dtype=np.intp, count=len(rows))
+                weights = np.fromiter(rows.values(), dtype=np.float32, count=len(rows))
+                vector = entry[1] = _solve(self.item_factors, self.gram, items, weights)
+        return vector if rows else None
+
+    def affinity(self, user, rows):
+        """Scores in [0, 1] for ``rows``: the user's predicted preference, else popularity; None without signals"""
+        vector = self._vector(user)
+        if vector is not None:
+            # Gathering factor rows costs more than a product over the whole catalog once
+            # the candidates are a sizeable share of it
+            if len(rows) * GATHER_SHARE > len(self.item_factors):
+                return np.clip((self.item_factors @ vector)[rows], 0, 1)
+            return np.clip(self.item_factors[rows] @ vector, 0, 1)
+        top = self.popularity.max()
+        if top <= 0:
+            return None
+        return np.log1p(self.popularity[rows]) / np.log1p(top)
+
+    def blend(self, user, rows, scores, share=BLEND):
+        """``scores`` with ``share`` of the weight moved to personal affinity"""
+        affinity = self.affinity(user, np.asarray(rows))
+        if affinity is None:
+            return scores
+        return ((1 - share) * scores + share * affinity).astype(np.float32)
+
+
+if __name__ == "__main__":
+    from nexusstay.catalog import cache_dir, load_catalog
+
+    snapshot = load_catalog()
+    started = time.perf_counter()
+    totals = aligned_totals(snapshot, InteractionLog())
+    user_ids, _, item_factors = fit(totals, len(snapshot))
+    model = Personalizer(snapshot, item_factors)
+    os.makedirs(cache_dir(), exist_ok=True)
+    model.save(os.path.join(cache_dir(), MODEL_NAME))
+    print(f"fit {len(user_ids)} users x {len(snapshot)} listings ({len(totals)} interactions) "
+          f"in {time.perf_counter() - started:.2f}s -> {os.path.join(cache_dir(), MODEL_NAME)}")
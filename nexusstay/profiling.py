@@ -0,0 +1,217 @@
+"""Per-section timing of script runs.
+
+A ``SpanRecorder`` keeps, for every named section of the page, cumulative
+Prometheus-style histogram buckets plus a rolling window of the latest
+durations for percentiles. ``sections()`` gives each script run a checkpoint
+timer (``enter("filters")`` closes the previous section and opens the next)
+so the top-level script needs no re-indenting; ``timed(name)`` wraps
+fragment bodies so fragment-only reruns are measured too.
+
+Recording is off unless ``NEXUSSTAY_PROFILE`` is set (or an export is
+configured); then ``sections()`` and ``timed()`` hand back no-op objects and
+an instrumented run costs one attribute call per section. Enabled recorders
+can write the histograms to a JSON file (``NEXUSSTAY_METRICS_FILE``) and serve
+them as Prometheus text on ``NEXUSSTAY_METRICS_PORT``.
+"""
+
+import bisect
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+PROFILE_ENV = "NEXUSSTAY_PROFILE"
+METRICS_FILE_ENV = "NEXUSSTAY_METRICS_FILE"
+METRICS_PORT_ENV = "NEXUSSTAY_METRICS_PORT"
+
+# Histogram upper bounds in seconds (the last bucket is +Inf)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC = "nexusstay_section_seconds"
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "recent", "last")
+
+    def __init__(self, window):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+        self.last = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.recent.append(seconds)
+        self.last = seconds
+
+
+class _NullSections:
+    """Stand-in for ``Sections`` when recording is disabled"""
+    __slots__ = ()
+
+    def enter(self, name):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_SECTIONS = _NullSections()
+
+
+class Sections:
+    """Checkpoint timer for one script run; each ``enter`` ends the previous section"""
+    __slots__ = ("recorder", "name", "started", "run_started")
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.name = None
+        self.started = self.run_started = time.perf_counter()
+
+    def enter(self, name):
+        now = time.perf_counter()
+        if self.name is not None:
+            self.recorder.record(self.name, now - self.started)
+        self.name, self.started = name, now
+
+    def close(self):
+        """End the open section and record the whole run as ``run``"""
+        self.enter(None)
+        self.recorder.record("run", self.started - self.run_started)
+        self.recorder.flush()
+
+
+class SpanRecorder:
+    def __init__(self, enabled=True, window=500, metrics_file=None, flush_interval=1.0):
+        self.enabled = enabled
+        self.window = window
+        self.metrics_file = metrics_file
+        self.flush_interval = flush_interval
+        self.histograms = {}
+        self.server = None
+        self._lock = threading.Lock()
+        self._flushed = 0.0
+
+    def sections(self):
+        """Checkpoint timer for a script run (a shared no-op when disabled)"""
+        return Sections(self) if self.enabled else NULL_SECTIONS
+
+    def timed(self, name):
+        """Decorator recording each call of a function (e.g. a fragment body) as ``name``"""
+        def decorate(function):
+            if not self.enabled:
+                return function
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def record(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = _Histogram(self.window)
+            histogram.add(seconds)
+
+    def snapshot(self):
+        """{section: stats} with cumulative buckets and rolling-window percentiles (ms)"""
+        with self._lock:
+            copies = {name: (list(h.counts), h.total, np.array(h.recent), h.last) for name, h in self.histograms.items()}
+        stats = {}
+        for name, (counts, total, recent, last) in sorted(copies.items()):
+            rolling = np.bincount(np.searchsorted(BUCKETS, recent), minlength=len(counts))
+            stats[name] = {
+                "count": sum(counts),
+                "sum_seconds": total,
+                "last_ms": last * 1000,
+                **{f"p{round(q * 100)}_ms": float(np.quantile(recent, q)) * 1000 for q in QUANTILES},
+                "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], counts)),
+                "rolling_buckets": dict(zip([*map(str, BUCKETS), "+Inf"], rolling.tolist())),
+            }
+        return stats
+
+    def flush(self, force=False):
+        """Write the JSON export (at most once per ``flush_interval``)"""
+        if not self.metrics_file:
+            return
+        now = time.monotonic()
+        if not force and now - self._flushed < self.flush_interval:
+            return
+        self._flushed = now
+        payload = {"generated_at": time.time(), "window": self.window, "sections": self.snapshot()}
+        directory = os.path.dirname(os.path.abspath(self.metrics_file))
+        os.makedirs(directory, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(handle, "w") as out:
+            json.dump(payload, out, indent=2)
+        os.replace(temporary, self.metrics_file)
+
+    def prometheus(self):
+        """Prometheus text exposition of the section histograms and rolling quantiles"""
+        lines = [f"# HELP {METRIC} Wall time of app sections per script or fragment run.",
+                 f"# TYPE {METRIC} histogram"]
+        stats = self.snapshot()
+        for name, section in stats.items():
+            cumulative = 0
+            for bound, count in section["buckets"].items():
+                cumulative += count
+                lines.append(f'{METRIC}_bucket{{section="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{METRIC}_sum{{section="{name}"}} {section["sum_seconds"]:.6f}')
+            lines.append(f'{METRIC}_count{{section="{name}"}} {section["count"]}')
+        lines += [f"# HELP {METRIC}_recent Quantiles over the last {self.window} runs of each section.",
+                  f"# TYPE {METRIC}_recent summary"]
+        for name, section in stats.items():
+            for q in QUANTILES:
+                value = section[f"p{round(q * 100)}_ms"] / 1000
+                lines.append(f'{METRIC}_recent{{section="{name}",quantile="{q}"}} {value:.6f}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve ``/metrics`` on a background thread"""
+        # Imported here: only processes that opt in to the endpoint pay for it
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        recorder = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = recorder.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="nexusstay-metrics", daemon=True).start()
+        return self.server
+
+
+def recorder_from_env():
+    """Recorder configured from the environment; disabled unless profiling or an export is requested"""
+    metrics_file = os.environ.get(METRICS_FILE_ENV) or None
+    port = os.environ.get(METRICS_PORT_ENV)
+    enabled = os.environ.get(PROFILE_ENV, "").lower() not in ("", "0", "false", "no") or bool(metrics_file or port)
+    recorder = SpanRecorder(enabled=enabled, metrics_file=metrics_file)
+    if enabled and port:
+        recorder.serve(int(port))
+    return recorder
@@ -0,0 +1,349 @@
+"""Natural-language listing queries for the concierge.
+
+A chat message is lexed with one regex pass and the tokens are parsed left
+to right with a few tokens of lookahead. The parser pulls out a nightly
+budget, a guest count, places, property types, amenities and leftover catalog
+keywords. The result compiles to the ``FilterState`` the sidebar builds, so
+a chat request runs on the same predicates and shared result cache. Parses
+are memoized by normalized text for each catalog snapshot.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from nexusstay.filters import FilterState
+from nexusstay.geo import DEFAULT_RADIUS_KM, KM_PER_MILE, PLACES
+from nexusstay.ranking import relevance_scores, top_k
+
+LEXER = re.compile(r"""
+    (?P<money>\$\s?\d[\d,]*(?:\.\d+)?k?|\d[\d,]*(?:\.\d+)?k?(?=\s?(?:usd|dollars?|bucks)\b)|\d+(?:\.\d+)?k\b)
+  | (?P<number>\d+)
+  | (?P<dash>[-–—])
+  | (?P<cmp>[<>])
+  | (?P<word>[a-z]+)
+""", re.X)
+
+Token = namedtuple("Token", ["kind", "text", "value"])
+
+PRICE_CEILING = np.iinfo(np.int32).max
+MIN_BARE_PRICE = 50
+MAX_PARTY = 50
+# Canned intents that answer a question rather than ask for listings ("how to book", "best locations")
+INFO_INTENTS = frozenset("greeting help booking cancellation thanks location".split())
+
+# phrase -> (field, value); phrases from the catalog vocabulary are added per snapshot
+PHRASES = {
+    ("under",): ("bound", "max"),
+    ("below",): ("bound", "max"),
+    ("less", "than"): ("bound", "max"),
+    ("cheaper", "than"): ("bound", "max"),
+    ("up", "to"): ("bound", "max"),
+    ("at", "most"): ("bound", "max"),
+    ("max",): ("bound", "max"),
+    ("maximum",): ("bound", "max"),
+    ("budget",): ("bound", "max"),
+    ("<",): ("bound", "max"),
+    ("over",): ("bound", "min"),
+    ("above",): ("bound", "min"),
+    ("more", "than"): ("bound", "min"),
+    ("at", "least"): ("bound", "min"),
+    ("min",): ("bound", "min"),
+    ("minimum",): ("bound", "min"),
+    ("from",): ("bound", "min"),
+    (">",): ("bound", "min"),
+    ("between",): ("bound", "between"),
+    ("for",): ("party", None),
+    ("sleeps",): ("party", None),
+    ("sleep",): ("party", None),
+    ("group", "of"): ("party", None),
+    ("family", "of"): ("party", None),
+    ("party", "of"): ("party", None),
+    ("solo",): ("guests", 1),
+    ("couple",): ("guests", 2),
+    ("couples",): ("guests", 2),
+    ("family",): ("guests", 4),
+}
+DISTANCE_UNITS = {"km": 1.0, "kms": 1.0, "kilometer": 1.0, "kilometers": 1.0, "kilometre": 1.0, "kilometres": 1.0,
+                  "mi": KM_PER_MILE, "mile": KM_PER_MILE, "miles": KM_PER_MILE}
+# Words between a distance and its place ("50 km of Aspen", "30 miles from Malibu")
+DISTANCE_LINKS = frozenset("of from around".split())
+GUEST_NOUNS = frozenset("guest guests people person persons adults travelers travellers pax".split())
+STAY_NOUNS = frozenset("night nights day days week weeks".split())
+# Words that never become keyword filters, even when the catalog uses them
+FILLER = frozenset("""
+    a an and any are at book can do find for friendly get give have i in is it like looking luxury me my near need
+    of on or our place places please properties property rental rentals show some something stay stays the to
+    want we what where which with within you
+""".split())
+TYPE_SYNONYMS = {"penthouse": "apartment", "flat": "apartment", "condo": "apartment", "chalet": "cabin",
+                 "lodge": "cabin", "studio": "loft", "palace": "castle"}
+AMENITY_SYNONYMS = {"wi fi": "wifi", "internet": "wifi", "jacuzzi": "hot tub", "hottub": "hot tub",
+                    "swimming pool": "pool", "air conditioning": "ac", "barbecue": "bbq", "grill": "bbq",
+                    "fitness": "gym", "office": "workspace", "fireplaces": "fireplace"}
+
+
+def normalize(text):
+    """Cache key for a message: lowercase, single-spaced, without trailing punctuation"""
+    return " ".join(str(text).lower().split()).strip(" ?!.")
+
+
+def lex(text):
+    """Tokens of normalized text"""
+    tokens = []
+    for match in LEXER.finditer(text):
+        kind, raw = match.lastgroup, match.group()
+        value = None
+        if kind in ("money", "number"):
+            amount = float(re.sub(r"[^\d.]", "", raw))
+            value = int(round(amount * (1000 if raw.endswith("k") else 1)))
+        tokens.append(Token(kind, raw, value))
+    return tokens
+
+
+def answers_from_catalog(query, intents):
+    """True when a parsed message should get catalog results rather than the top canned intent reply"""
+    if query.specific:
+        return True
+    return query.constrained and not (intents and intents[0].name in INFO_INTENTS)
+
+
+def listing_lines(snapshot, rows):
+    """One chat bullet per row: title, location, price, rating and capacity"""
+    return [f"• **{item['title']}** — {item['location']} · ${item['price']}/night · "
+            f"⭐ {round(item['rating'], 2)} · 👥 {item['guests']}"
+            for item in snapshot.rows(rows).to_dict("records")]
+
+
+def _plurals(words):
+    last = words[-1]
+    forms = {last, last + "s", last + "es"}
+    if last.endswith("y"):
+        forms.add(last[:-1] + "ies")
+    return [words[:-1] + (form,) for form in forms]
+
+
+class ParsedQuery(namedtuple("ParsedQuery", ["price", "guests", "locations", "types", "amenities", "keywords", "near"],
+                             defaults=(None,))):
+    __slots__ = ()
+
+    @property
+    def constrained(self):
+        """True when the message asked for anything the catalog can filter on"""
+        return any(self)
+
+    @property
+    def specific(self):
+        """True when the message named a budget, place, type or amenity (not just a party size or keyword)"""
+        return any((self.price, self.locations, self.types, self.amenities, self.near))
+
+    def describe(self):
+        """Short human summary, e.g. ``under $500 · 4+ guests · Aspen, Colorado``"""
+        parts = []
+        if self.price:
+            low, high = self.price
+            if low and high is not None:
+                parts.append(f"${low:,}–${high:,}")
+            elif high is not None:
+                parts.append(f"under ${high:,}")
+            else:
+                parts.append(f"from ${low:,}")
+        if self.guests:
+            parts.append(f"{self.guests}+ guests")
+        if self.locations:
+            parts.append(" / ".join(self.locations) if len(self.locations) <= 2 else f"{len(self.locations)} locations")
+        if self.near:
+            places, km = self.near
+            parts.append(f"within {km:,.0f} km of {' / '.join(places) if len(places) <= 2 else f'{len(places)} places'}")
+        parts.extend(self.types)
+        parts.extend(self.amenities)
+        if self.keywords:
+            parts.append(" ".join(f'"{keyword}"' for keyword in self.keywords))
+        return " · ".join(parts)
+
+
+class QueryCompiler:
+    def __init__(self, snapshot, cache_size=4096):
+        self.snapshot = snapshot
+        self.phrases = dict(PHRASES)
+        frame = snapshot.frame
+        self._add_categories("locations", frame["location"].cat.categories,
+                             lambda name: [part.strip() for part in name.split(",")])
+        self._add_categories("types", frame["type"].cat.categories,
+                             lambda name: [name, name.split()[-1]], TYPE_SYNONYMS)
+        self._add_categories("amenities", snapshot.amenity_index.vocabulary,
+                             lambda name: [name], AMENITY_SYNONYMS)
+        # Known places without listings of their own ("near Denver") search around their coordinates
+        # (catalog destinations keep their own phrases, e.g. "new york" still means Manhattan / Brooklyn)
+        taken = set(self.phrases)
+        self._add_categories("places", [name for name in PLACES if name not in set(frame["location"].cat.categories)],
+                             lambda name: [alias for alias in (name, name.split(",")[0])
+                                           if tuple(re.findall(r"[a-z]+", alias.lower())) not in taken])
+        self.longest = max(len(phrase) for phrase in self.phrases)
+        self.parse = lru_cache(maxsize=cache_size)(self._parse)
+
+    def _add_categories(self, field, names, aliases, synonyms=None):
+        """Map every alias (and its plural) of each name to the names it stands for"""
+        found = {}
+        for name in names:
+            for alias in aliases(name):
+                found.setdefault(tuple(re.findall(r"[a-z]+", alias.lower())), set()).add(name)
+        for synonym, target in (synonyms or {}).items():
+            if tuple(target.split()) in found:
+                found.setdefault(tuple(synonym.split()), set()).update(found[tuple(target.split())])
+        for words, matched in found.items():
+            if not words:
+                continue
+            for form in _plurals(words):
+                previous = self.phrases.get(form)
+                if previous is not None and previous[0] == field:
+                    matched = matched | set(previous[1])
+                self.phrases[form] = (field, tuple(sorted(matched)))
+
+    def _phrase(self, tokens, i):
+        """(length, (field, value)) of the longest phrase starting at token ``i``"""
+        for n in range(min(self.longest, len(tokens) - i), 0, -1):
+            words = tuple(token.text for token in tokens[i:i + n])
+            entry = self.phrases.get(words)
+            if entry is not None:
+                return n, entry
+        return 0, None
+
+    def _keyword(self, word):
+        """Catalog term for a leftover word (singularized if needed), or None"""
+        if word in FILLER or len(word) < 3:
+            return None
+        terms = self.snapshot.text_index.terms
+        for candidate in (word, word[:-1] if word.endswith("s") else None):
+            if candidate:
+                position = np.searchsorted(terms, candidate)
+                if position < len(terms) and terms[position] == candidate:
+                    return candidate
+        return None
+
+    def _parse(self, normalized):
+        tokens = lex(normalized)
+        low = high = guests = None
+        fields = {"locations": {}, "types": {}, "amenities": {}, "keywords": {}}
+        bound = party = radius = near = None
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token.kind in ("money", "number"):
+                first, second, i = self._amount(tokens, i, bound == "between")
+                following = tokens[i].text if i < len(tokens) else None
+                is_money = token.kind == "money" or (second is not None and tokens[i - 1].kind == "money")
+                if following in GUEST_NOUNS:
+                    guests = second or first
+                    i += 1
+                elif following in STAY_NOUNS:
+                    # "for 3 nights" is a stay length, not a party size
+                    i += 1
+                elif following in DISTANCE_UNITS:
+                    radius = (second or first) * DISTANCE_UNITS[following]
+                    i += 1
+                    while i < len(tokens) and tokens[i].text in DISTANCE_LINKS:
+                        i += 1
+                elif party and not is_money and (second or first) <= MAX_PARTY:
+                    guests = second or first
+                elif is_money or bound or first >= MIN_BARE_PRICE:
+                    if second is not None:
+                        low, high = min(first, second), max(first, second)
+                    elif bound == "min":
+                        low = first
+                    else:
+                        high = first
+                bound = party = None
+                continue
+            n, entry = self._phrase(tokens, i) if token.kind in ("word", "cmp") else (0, None)
+            if entry is None:
+                keyword = self._keyword(token.text) if token.kind == "word" else None
+                if keyword:
+                    fields["keywords"][keyword] = None
+                i += 1
+                continue
+            field, value = entry
+            if field == "places" or (field == "locations" and radius is not None):
+                near = (value, radius or DEFAULT_RADIUS_KM)
+                radius = None
+            elif field == "bound":
+                bound = value
+            elif field == "party":
+                party = True
+            elif field == "guests":
+                guests = max(guests or 0, value)
+            else:
+                fields[field].update(dict.fromkeys(value))
+            i += n
+        price = (low, high) if low is not None or high is not None else None
+        return ParsedQuery(price, guests, *(tuple(fields[name]) for name in ("locations", "types", "amenities", "keywords")),
+                           near)
+
+    @staticmethod
+    def _amount(tokens, i, between):
+        """(first, second or None, next index) for an amount or an ``A-B`` / ``A to B`` range"""
+        first = tokens[i].value
+        j = i + 1
+        joiner = tokens[j] if j < len(tokens) else None
+        if joiner is not None and (joiner.kind == "dash" or joiner.text == "to" or (between and joiner.text == "and")):
+            if j + 1 < len(tokens) and tokens[j + 1].kind in ("money", "number"):
+                return first, tokens[j + 1].value, j + 2
+        return first, None, j
+
+    def filter_state(self, query):
+        """The sidebar-equivalent ``FilterState`` for a parsed query"""
+        low, high = query.price or (None, None)
+        return FilterState(
+            price=(low or 0, PRICE_CEILING if high is None else high),
+            # An empty type list means "none" to the sidebar predicate
+            types=tuple(sorted(query.types or self.snapshot.frame["type"].cat.categories)),
+            amenities=tuple(sorted(query.amenities)),
+            search=(" ".join(query.keywords), False),
+            guests=query.guests or 1,
+            locations=tuple(sorted(query.locations)),
+            near=self._near(query.near),
+        )
+
+    def _near(self, near):
+        """(lat, lon, km) around the center of the places in ``near``, or None when none is known"""
+        if not near:
+            return None
+        places, km = near
+        centers = [self.snapshot.geo_index.center(place, self.snapshot.frame) for place in places]
+        centers = [center for center in centers if center is not None]
+        if not centers:
+            return None
+        lat, lon = np.mean(centers, axis=0)
+        return (round(float(lat), 4), round(float(lon), 4), float(km))
+
+    def reply(self, query, rows, limit=3):
+        """Chat reply presenting the best of ``rows`` for ``query``"""
+        summary = query.describe()
+        if not len(rows):
+            center = self._near(query.near)
+            if center:
+                nearest, distances = self.snapshot.geo_index.nearest(center[0], center[1], limit)
+                if len(nearest):
+                    lines = [f"{line} · {distance:,.0f} km away"
+                             for line, distance in zip(listing_lines(self.snapshot, nearest), distances)]
+                    return "\n".join([f"🤖 I couldn't find any stays for {summary}. The nearest stays:", "", *lines])
+            closest = self.snapshot.similarity.alternatives(
+                query.price, query.types, query.locations, query.amenities, query.guests, k=limit)
+            if not len(closest):
+                return f"🤖 I couldn't find any stays for {summary}. Try a higher budget or fewer must-haves!"
+            return "\n".join([f"🤖 I couldn't find any stays for {summary}. The closest alternatives:", "",
+                              *listing_lines(self.snapshot, closest)])
+        frame = self.snapshot.frame
+        text_strength = self.snapshot.text_index.strength(" ".join(query.keywords), rows) if query.keywords else None
+        price_band = None
+        if query.price and query.price[0] and query.price[1] is not None:
+            price_band = query.price
+        scores = relevance_scores(frame, rows, text_strength, query.guests, price_band)
+        best = np.asarray(rows)[top_k(scores, limit)]
+        lines = [f"🔎 **{len(rows)} {'stay matches' if len(rows) == 1 else 'stays match'}** {summary}:", ""]
+        lines += listing_lines(self.snapshot, best)
+        if len(rows) > limit:
+            lines += ["", "Want me to narrow these down further?"]
+        return "\n".join(lines)
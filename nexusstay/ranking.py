@@ -0,0 +1,65 @@
+"""Relevance ranking for filtered candidates (the "AI Match" score).
+
+All candidates are scored in one vectorized pass; only the top ``k`` needed
+for the visible pages are ordered, via ``argpartition`` rather than a full
+sort.
+"""
+
+import numpy as np
+
+WEIGHTS = {
+    "rating": 0.40,
+    "reviews": 0.15,
+    "discount": 0.10,
+    "text": 0.15,
+    "guests": 0.10,
+    "price": 0.10,
+}
+MAX_DISCOUNT = 50.0
+
+
+def relevance_scores(frame, rows, text_strength=None, guests=None, price_band=None, weights=WEIGHTS):
+    """Scores in [0, 1] for the candidate rows, aligned with ``rows``"""
+    rows = np.asarray(rows)
+    if not len(rows):
+        return np.zeros(0, dtype=np.float32)
+
+    rating = frame["rating"].to_numpy()[rows]
+    reviews = np.log1p(frame["reviews"].to_numpy()[rows].astype(np.float32))
+    discount = frame["discount"].to_numpy()[rows].astype(np.float32)
+    capacity = frame["guests"].to_numpy()[rows].astype(np.float32)
+    price = frame["price"].to_numpy()[rows].astype(np.float32)
+
+    score = weights["rating"] * np.clip(rating - np.float32(4.0), 0, 1)
+    if reviews.max() > 0:
+        score += weights["reviews"] * (reviews / reviews.max())
+    score += weights["discount"] * np.clip(discount / np.float32(MAX_DISCOUNT), 0, 1)
+    score += weights["text"] * (1 if text_strength is None else text_strength)
+    if guests:
+        # Listings sized for the party beat ones that are far too large
+        score += weights["guests"] * np.minimum(np.float32(guests) / np.maximum(capacity, 1), 1)
+    else:
+        score += weights["guests"]
+    if price_band is not None and price_band[1] > price_band[0]:
+        center = (price_band[0] + price_band[1]) / 2
+        half_width = (price_band[1] - price_band[0]) / 2
+        score += weights["price"] * np.clip(1 - np.abs(price - np.float32(center)) / np.float32(half_width), 0, 1)
+    else:
+        score += weights["price"]
+    return (score / np.float32(sum(weights.values()))).astype(np.float32)
+
+
+def top_k(scores, k):
+    """Positions of the ``k`` best scores, best first; ties keep candidate order"""
+    scores = np.asarray(scores)
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    if k < len(scores):
+        kth = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        # Keep every tie at the boundary so successive pages agree on the order
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(len(scores))
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:k]
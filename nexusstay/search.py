@@ -0,0 +1,262 @@
+"""Inverted text index behind the "AI-Powered Search" box.
+
+Titles, locations, property types and amenity names are tokenized once per
+catalog snapshot. Each term owns a posting list of row ids stored as a slice
+of one sorted ``int32`` array (CSR layout), and the term dictionary is a
+sorted array so prefix lookups are a pair of binary searches.
+
+Query words that prefix no term are treated as typos. A character-trigram
+index over the term dictionary (not the rows) proposes terms sharing enough
+trigrams. The best few are checked with a bounded edit distance, and the
+closest one replaces the word.
+"""
+
+import re
+from functools import cached_property, lru_cache
+
+import numpy as np
+import pandas as pd
+
+TOKEN_PATTERN = r"[a-z0-9]+"
+TOKEN_RE = re.compile(TOKEN_PATTERN)
+
+
+def sorted_unique(values):
+    """Sorted distinct values; a plain sort beats hash-based ``np.unique`` on int arrays"""
+    values = np.sort(values)
+    if len(values) < 2:
+        return values
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+
+def tokenize(text):
+    """Lowercase word tokens of ``text``"""
+    return TOKEN_RE.findall(str(text).lower())
+
+
+def max_edits(word):
+    """Typos tolerated in a word: none below 4 letters, two from 8"""
+    return 0 if len(word) < 4 else 1 if len(word) < 8 else 2
+
+
+def trigrams(word):
+    """Character trigrams of ``word`` padded so its first and last letters count fully"""
+    padded = f"  {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def edit_distance(a, b, bound):
+    """Edit distance with adjacent transpositions, or ``bound + 1`` once it exceeds ``bound``"""
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > bound:
+            return bound + 1
+        before, previous = previous, current
+    return min(previous[-1], bound + 1)
+
+
+class TrigramIndex:
+    """Trigram -> term ids (CSR) over a sorted term dictionary"""
+
+    def __init__(self, grams, offsets, term_ids, lengths):
+        self.grams = grams
+        self.offsets = offsets
+        self.term_ids = term_ids
+        self.lengths = lengths
+
+    @classmethod
+    def from_terms(cls, terms):
+        pairs = {}
+        for term_id, term in enumerate(terms):
+            for gram in set(trigrams(term)):
+                pairs.setdefault(gram, []).append(term_id)
+        grams = np.array(sorted(pairs), dtype=str)
+        counts = np.array([len(pairs[gram]) for gram in grams], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        term_ids = np.fromiter((term_id for gram in grams for term_id in pairs[gram]), dtype=np.int32, count=int(offsets[-1]))
+        lengths = np.fromiter(map(len, terms), dtype=np.int16, count=len(terms))
+        return cls(grams, offsets, term_ids, lengths)
+
+    def candidates(self, word, edits, limit=64):
+        """Term ids that can be within ``edits`` of ``word``, most shared trigrams first
+
+        ``edits`` edits change at most ``3 * edits`` trigrams, so terms sharing
+        fewer can be skipped without computing a distance.
+        """
+        grams = np.array(sorted(set(trigrams(word))), dtype=str)
+        if not len(self.grams):
+            return np.zeros(0, dtype=np.int32)
+        position = np.minimum(np.searchsorted(self.grams, grams), len(self.grams) - 1)
+        found = position[self.grams[position] == grams]
+        if not len(found):
+            return np.zeros(0, dtype=np.int32)
+        ids, shared = np.unique(np.concatenate([self.term_ids[self.offsets[i]:self.offsets[i + 1]] for i in found]),
+                                return_counts=True)
+        keep = (shared >= max(len(grams) - 3 * edits, 1)) & (np.abs(self.lengths[ids] - len(word)) <= edits)
+        ids, shared = ids[keep], shared[keep]
+        return ids[np.argsort(-shared, kind="stable")[:limit]]
+
+
+def _text_pairs(series):
+    """(row, token) pairs for a free-text column"""
+    tokens = series.astype(str).str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+    return tokens.index.to_numpy(), tokens.to_numpy(dtype=object)
+
+
+def _category_pairs(series):
+    """(row, token) pairs for a categorical column, tokenizing each category once"""
+    categorical = pd.Categorical(series)
+    codes = categorical.codes
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(categorical.categories) + 1))
+    rows, terms = [], []
+    for code, category in enumerate(categorical.categories):
+        members = order[bounds[code]:bounds[code + 1]]
+        for token in tokenize(category):
+            rows.append(members)
+            terms.append(np.full(len(members), token, dtype=object))
+    return rows, terms
+
+
+class TextIndex:
+    def __init__(self, terms, offsets, postings, size):
+        self.terms = terms
+        self.offsets = offsets
+        self.postings = postings
+        self.size = size
+        self.correct = lru_cache(maxsize=4096)(self._correct)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, text_fields=("title",), category_fields=("type", "location")):
+        """Build the index from a catalog snapshot"""
+        frame = snapshot.frame
+        rows, terms = [], []
+        for name in text_fields:
+            field_rows, field_terms = _text_pairs(frame[name])
+            rows.append(field_rows)
+            terms.append(field_terms)
+        for name in category_fields:
+            field_rows, field_terms = _category_pairs(frame[name])
+            rows.extend(field_rows)
+            terms.extend(field_terms)
+        amenities = snapshot.amenity_index
+        for name in amenities.vocabulary:
+            members = np.flatnonzero(amenities.has(name))
+            for token in tokenize(name):
+                rows.append(members)
+                terms.append(np.full(len(members), token, dtype=object))
+        return cls.from_pairs(np.concatenate(rows), np.concatenate(terms), len(frame))
+
+    @classmethod
+    def from_pairs(cls, rows, terms, size):
+        """Build the CSR layout from parallel (row, term) arrays"""
+        codes, uniques = pd.factorize(terms)
+        order = np.argsort(uniques.astype(str))
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        keys = sorted_unique(rank[codes].astype(np.int64) * max(size, 1) + rows.astype(np.int64))
+        term_ids, postings = np.divmod(keys, max(size, 1))
+        offsets = np.searchsorted(term_ids, np.arange(len(order) + 1))
+        sorted_terms = np.asarray(uniques.astype(str))[order]
+        return cls(sorted_terms, offsets, postings.astype(np.int32), size)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def term_range(self, prefix):
+        """Half-open range of term ids starting with ``prefix``"""
+        lo = int(np.searchsorted(self.terms, prefix, side="left"))
+        hi = int(np.searchsorted(self.terms, prefix + "\uffff", side="left"))
+        return lo, hi
+
+    def posting(self, term_id):
+        return self.postings[self.offsets[term_id]:self.offsets[term_id + 1]]
+
+    def prefix_rows(self, prefix):
+        """Sorted row ids containing a term starting with ``prefix``"""
+        lo, hi = self.term_range(prefix)
+        if hi - lo == 1:
+            return self.posting(lo)
+        return sorted_unique(self.postings[self.offsets[lo]:self.offsets[hi]])
+
+    @cached_property
+    def trigram_index(self):
+        """Trigram index over the term dictionary, built on the first misspelled word"""
+        return TrigramIndex.from_terms(self.terms)
+
+    def _correct(self, word):
+        """Closest term to a word that prefixes nothing, or None when none is close enough"""
+        edits = max_edits(word)
+        if not edits:
+            return None
+        best, best_distance, best_rows = None, edits + 1, 0
+        for term_id in self.trigram_index.candidates(word, edits):
+            term = self.terms[term_id]
+            distance = edit_distance(word, term, edits)
+            rows = self.offsets[term_id + 1] - self.offsets[term_id]
+            # Ties go to the term on more listings
+            if distance < best_distance or (distance == best_distance and rows > best_rows):
+                best, best_distance, best_rows = str(term), distance, rows
+        return best
+
+    def _fix(self, token):
+        """Correction for a token that prefixes no term, else None"""
+        lo, hi = self.term_range(token)
+        return self.correct(token) if lo == hi else None
+
+    def tokens(self, query):
+        """Distinct query tokens, each misspelled one replaced by its correction when there is one"""
+        return list(dict.fromkeys(self._fix(token) or token for token in tokenize(query)))
+
+    def suggest(self, query):
+        """Corrected query when any word was misspelled, else None"""
+        tokens = tokenize(query)
+        fixed = [self._fix(token) for token in tokens]
+        if not any(fixed):
+            return None
+        return " ".join(correction or token for token, correction in zip(tokens, fixed))
+
+    def search(self, query):
+        """Row ids matching every query token (by prefix, after typo correction), or None for an empty query"""
+        tokens = self.tokens(query)
+        if not tokens:
+            return None
+        lists = sorted((self.prefix_rows(token) for token in tokens), key=len)
+        result = lists[0]
+        for rows in lists[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, rows, assume_unique=True)
+        return result
+
+    def strength(self, query, rows):
+        """Per-row match strength in [0.5, 1]: whole-word hits count fully, prefix-only hits half"""
+        tokens = self.tokens(query)
+        if not tokens:
+            return None
+        rows = np.asarray(rows)
+        strength = np.full(len(rows), 0.5 * len(tokens), dtype=np.float32)
+        for token in tokens:
+            lo, hi = self.term_range(token)
+            if lo == hi or self.terms[lo] != token:
+                continue
+            posting = self.posting(lo)
+            found = np.minimum(np.searchsorted(posting, rows), len(posting) - 1)
+            strength += 0.5 * (posting[found] == rows)
+        return strength / len(tokens)
+
+    def mask(self, query):
+        """Boolean row mask for ``query``; all rows match an empty query"""
+        rows = self.search(query)
+        if rows is None:
+            return np.ones(self.size, dtype=bool)
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        return mask
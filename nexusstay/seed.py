@@ -0,0 +1,142 @@
+"""Built-in listings used when no catalog file is configured"""
+
+SEED_PROPERTIES = [
+    {
+        "id": 1,
+        "title": "Skyline Penthouse Infinity Views",
+        "location": "Manhattan, New York",
+        "latitude": 40.7614,
+        "longitude": -73.9776,
+        "price": 450,
+        "original_price": 520,
+        "type": "Luxury Apartment",
+        "rating": 4.95,
+        "reviews": 128,
+        "superhost": True,
+        "instant_book": True,
+        "image": "https://images.unsplash.com/photo-1545324418-cc1a3fa10c00?q=80&w=2187&auto=format&fit=crop",
+        "amenities": ["WiFi", "Kitchen", "AC", "Hot Tub", "Gym", "Pool", "Parking"],
+        "bedrooms": 3,
+        "bathrooms": 2,
+        "guests": 6,
+        "description": "Stunning penthouse with panoramic city views, modern amenities, and premium finishes throughout.",
+        "popular": True,
+        "featured": True,
+        "discount": 15
+    },
+    {
+        "id": 2,
+        "title": "Oceanfront Villa Private Beach",
+        "location": "Malibu, California",
+        "latitude": 34.0367,
+        "longitude": -118.6923,
+        "price": 890,
+        "original_price": 950,
+        "type": "Luxury Villa",
+        "rating": 4.98,
+        "reviews": 76,
+        "superhost": True,
+        "instant_book": True,
+        "image": "https://images.unsplash.com/photo-1582268611958-ebfd161ef9cf?q=80&w=2070&auto=format&fit=crop",
+        "amenities": ["WiFi", "Kitchen", "Pool", "Beachfront", "Hot Tub", "BBQ", "Parking"],
+        "bedrooms": 4,
+        "bathrooms": 3,
+        "guests": 8,
+        "description": "Exclusive beachfront property with direct beach access and breathtaking ocean views.",
+        "popular": True,
+        "featured": True,
+        "discount": 8
+    },
+    {
+        "id": 3,
+        "title": "Alpine Retreat Mountain Spa",
+        "location": "Aspen, Colorado",
+        "latitude": 39.1869,
+        "longitude": -106.8181,
+        "price": 320,
+        "original_price": 380,
+        "type": "Mountain Cabin",
+        "rating": 4.89,
+        "reviews": 94,
+        "superhost": True,
+        "instant_book": False,
+        "image": "https://images.unsplash.com/photo-1449824913935-59a10b8d2000?q=80&w=2070&auto=format&fit=crop",
+        "amenities": ["WiFi", "Kitchen", "Hot Tub", "Fireplace", "Mountain View", "Hiking", "Spa"],
+        "bedrooms": 2,
+        "bathrooms": 2,
+        "guests": 4,
+        "description": "Cozy mountain cabin perfect for ski trips and summer getaways with modern comforts.",
+        "popular": False,
+        "featured": False,
+        "discount": 18
+    },
+    {
+        "id": 4,
+        "title": "Designer Loft Arts District",
+        "location": "Chicago, Illinois",
+        "latitude": 41.8847,
+        "longitude": -87.6477,
+        "price": 280,
+        "original_price": 320,
+        "type": "Designer Loft",
+        "rating": 4.92,
+        "reviews": 156,
+        "superhost": False,
+        "instant_book": True,
+        "image": "https://images.unsplash.com/photo-1536376072261-38c75010e6c9?q=80&w=2071&auto=format&fit=crop",
+        "amenities": ["WiFi", "Kitchen", "AC", "Workspace", "Balcony", "City View", "Art Studio"],
+        "bedrooms": 1,
+        "bathrooms": 1,
+        "guests": 2,
+        "description": "Beautifully designed loft in the heart of the arts district with high ceilings and natural light.",
+        "popular": True,
+        "featured": False,
+        "discount": 14
+    },
+    {
+        "id": 5,
+        "title": "Tropical Paradise Private Island",
+        "location": "Miami, Florida",
+        "latitude": 25.7907,
+        "longitude": -80.13,
+        "price": 620,
+        "original_price": 690,
+        "type": "Beach House",
+        "rating": 4.96,
+        "reviews": 203,
+        "superhost": True,
+        "instant_book": True,
+        "image": "https://q-xx.bstatic.com/xdata/images/hotel/max1024x768/450518775.jpg?k=31a259c55a2326c5e08569d8d56c8ad3d436c6780b5f5b71dd5fab3b1ba9764b&o=&s=1024x",
+        "amenities": ["WiFi", "Kitchen", "Pool", "Beachfront", "BBQ", "Garden", "Parking", "Private Beach"],
+        "bedrooms": 3,
+        "bathrooms": 2,
+        "guests": 6,
+        "description": "Private tropical oasis with direct beach access and lush garden surroundings.",
+        "popular": True,
+        "featured": True,
+        "discount": 12
+    },
+    {
+        "id": 6,
+        "title": "Historic Castle Medieval Experience",
+        "location": "Edinburgh, Scotland",
+        "latitude": 55.9486,
+        "longitude": -3.1999,
+        "price": 1200,
+        "original_price": 1500,
+        "type": "Historic Castle",
+        "rating": 4.99,
+        "reviews": 45,
+        "superhost": True,
+        "instant_book": False,
+        "image": "https://images.unsplash.com/photo-1589656384667-54f1c6bd9066?q=80&w=2069&auto=format&fit=crop",
+        "amenities": ["WiFi", "Kitchen", "Fireplace", "Historic", "Gardens", "Library", "Wine Cellar"],
+        "bedrooms": 8,
+        "bathrooms": 6,
+        "guests": 16,
+        "description": "Authentic medieval castle with modern amenities and historic charm.",
+        "popular": False,
+        "featured": True,
+        "discount": 25
+    }
+]
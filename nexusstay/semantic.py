@@ -0,0 +1,191 @@
+"""Offline semantic search over titles, descriptions, types and amenities.
+
+Documents are embedded without any model download: tokens and bigrams are
+hashed into a fixed feature space, weighted by TF-IDF and folded through a
+deterministic sign projection into a small dense space. The resulting
+float32 matrix is cached as ``.npy`` and memory-mapped on later loads, and a
+query is answered with a batched matrix-vector product. Past
+``ANN_THRESHOLD`` rows an IVF index (k-means lists, nearest lists probed)
+narrows the candidates before the exact rerank.
+"""
+
+import os
+import zlib
+
+import numpy as np
+
+from nexusstay.search import tokenize
+
+DIMENSIONS = 256
+HASH_BUCKETS = 1 << 20
+ANN_THRESHOLD = 100_000
+BATCH_ROWS = 65_536
+MIN_SCORE = 0.15
+RELATIVE_SCORE = 0.5
+STOPWORDS = frozenset("a an and the with for in on of to at by from near my our me i is are".split())
+
+
+def terms(text):
+    """Light-stemmed unigrams plus bigrams used as features"""
+    words = [word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+             for word in tokenize(text) if word not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _buckets(features):
+    return np.fromiter((zlib.crc32(feature.encode()) % HASH_BUCKETS for feature in features), dtype=np.int64, count=len(features))
+
+
+def _projection(buckets, dimensions=DIMENSIONS):
+    """Deterministic +-1 projection rows for hash buckets (splitmix64 of bucket, column)"""
+    with np.errstate(over="ignore"):
+        x = (buckets.astype(np.uint64)[:, None] * np.uint64(dimensions) + np.arange(dimensions, dtype=np.uint64)) + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x ^= x >> np.uint64(31)
+    signs = (x & np.uint64(1)).astype(np.float32) * 2 - 1
+    return signs / np.float32(np.sqrt(dimensions))
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, np.float32(1e-12))
+
+
+def document_text(frame):
+    """Concatenated searchable text per listing"""
+    amenities = frame["amenities"].map(" ".join)
+    return (frame["title"].astype(str) + " " + frame["description"].astype(str) + " "
+            + frame["type"].astype(str) + " " + amenities.astype(str)).tolist()
+
+
+class IVFIndex:
+    """Inverted-file ANN index: spherical k-means lists probed nearest-first"""
+
+    def __init__(self, vectors, lists=256, probes=16, sample=20_000, iterations=8, seed=7):
+        rng = np.random.default_rng(seed)
+        training = np.asarray(vectors[np.sort(rng.choice(len(vectors), min(sample, len(vectors)), replace=False))])
+        centroids = training[rng.choice(len(training), min(lists, len(training)), replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(training @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, training)
+            filled = np.bincount(assignment, minlength=len(centroids)) > 0
+            centroids[filled] = _normalize(sums[filled])
+        self.centroids = centroids
+        self.probes = probes
+        assignment = np.concatenate([
+            np.argmax(np.asarray(vectors[start:start + BATCH_ROWS]) @ centroids.T, axis=1)
+            for start in range(0, len(vectors), BATCH_ROWS)
+        ])
+        self.order = np.argsort(assignment, kind="stable").astype(np.int32)
+        self.offsets = np.searchsorted(assignment[self.order], np.arange(len(centroids) + 1))
+
+    def candidates(self, query):
+        """Sorted row ids in the lists whose centroids are closest to ``query``"""
+        nearest = np.argsort(-(self.centroids @ query))[:self.probes]
+        found = [self.order[self.offsets[i]:self.offsets[i + 1]] for i in nearest]
+        return np.sort(np.concatenate(found))
+
+
+class SemanticIndex:
+    def __init__(self, vectors, idf):
+        self.vectors = vectors
+        self.idf = idf
+        self.unseen_idf = idf.max()
+        self.ann = IVFIndex(vectors) if len(vectors) > ANN_THRESHOLD else None
+
+    @classmethod
+    def build(cls, texts, dimensions=DIMENSIONS, batch=4096):
+        """Embed a list of documents"""
+        doc_buckets = [_buckets(sorted(set(terms(text)))) for text in texts]
+        counts = np.bincount(np.concatenate(doc_buckets) if doc_buckets else np.zeros(0, np.int64), minlength=HASH_BUCKETS)
+        idf = np.log((1 + len(texts)) / (1 + counts)).astype(np.float32) + 1
+        vectors = np.zeros((len(texts), dimensions), dtype=np.float32)
+        for start in range(0, len(texts), batch):
+            chunk = doc_buckets[start:start + batch]
+            lengths = np.array([len(buckets) for buckets in chunk])
+            if not lengths.sum():
+                continue
+            flat = np.concatenate(chunk)
+            weighted = _projection(flat, dimensions) * idf[flat][:, None]
+            starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            present = lengths > 0
+            vectors[start:start + len(chunk)][present] = np.add.reduceat(weighted, starts[present], axis=0)
+        return cls(_normalize(vectors), idf)
+
+    @classmethod
+    def for_snapshot(cls, snapshot, cache_dir=None):
+        """Load the snapshot's embeddings from the cache directory, building them if needed"""
+        if cache_dir is None:
+            return cls.build(document_text(snapshot.frame))
+        vectors_path = os.path.join(cache_dir, f"semantic-{snapshot.version}.npy")
+        idf_path = os.path.join(cache_dir, f"semantic-{snapshot.version}-idf.npy")
+        if os.path.exists(vectors_path) and os.path.exists(idf_path):
+            return cls(np.load(vectors_path, mmap_mode="r"), np.load(idf_path, mmap_mode="r"))
+        index = cls.build(document_text(snapshot.frame))
+        os.makedirs(cache_dir, exist_ok=True)
+        np.save(idf_path, index.idf)
+        np.save(vectors_path, index.vectors)
+        return index
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def embed(self, text):
+        """Unit query vector for free text"""
+        buckets = _buckets(sorted(set(terms(text))))
+        # Features that never occur in the catalog only add projection noise
+        buckets = buckets[self.idf[buckets] < self.unseen_idf]
+        if not len(buckets):
+            return None
+        vector = (_projection(buckets, self.vectors.shape[1]) * self.idf[buckets][:, None]).sum(axis=0)
+        return _normalize(vector)
+
+    def _similarity(self, query, rows=None):
+        if rows is not None:
+            return np.asarray(self.vectors[rows]) @ query
+        if not len(self):
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate([
+            np.asarray(self.vectors[start:start + BATCH_ROWS]) @ query
+            for start in range(0, len(self), BATCH_ROWS)
+        ])
+
+    def scores(self, text, rows=None):
+        """Cosine similarity of each row to ``text`` (all rows, or just ``rows``)"""
+        query = self.embed(text)
+        if query is None:
+            return np.zeros(len(self) if rows is None else len(rows), dtype=np.float32)
+        return self._similarity(query, rows)
+
+    def matches(self, text, min_score=MIN_SCORE, relative=RELATIVE_SCORE):
+        """(sorted row ids, scores) close enough to ``text`` to count as a match
+
+        A row must clear ``min_score`` and be within ``relative`` of the best
+        score, which keeps projection noise out of the results.
+        """
+        query = self.embed(text)
+        if query is None:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.float32)
+        rows = self.ann.candidates(query) if self.ann is not None else None
+        scores = self._similarity(query, rows)
+        if rows is None:
+            rows = np.arange(len(scores))
+        if not len(scores):
+            return rows, scores
+        keep = scores >= max(min_score, relative * scores.max())
+        return rows[keep], scores[keep]
+
+    def strength(self, text, rows):
+        """Similarity of ``rows`` to ``text`` scaled so the best row scores 1"""
+        scores = np.clip(self.scores(text, rows), 0, None)
+        if not len(scores) or scores.max() <= 0:
+            return scores
+        return scores / scores.max()
+
+    def search(self, text, k=10):
+        """(row ids, scores) of the ``k`` nearest listings, best first"""
+        rows, scores = self.matches(text, min_score=-1.0, relative=0.0)
+        best = np.argsort(-scores, kind="stable")[:k]
+        return rows[best], scores[best]
@@ -0,0 +1,79 @@
+"""Compact per-session state.
+
+Sessions only remember listing and booking ids; display data is resolved
+from the shared catalog when it is rendered. ``session_footprint`` reports
+how much memory a session's state holds so servers can be sized.
+"""
+
+import sys
+
+import numpy as np
+
+
+class IdSet:
+    """Insertion-ordered set of integer ids with O(1) membership"""
+    __slots__ = ("_ids",)
+
+    def __init__(self, ids=()):
+        self._ids = dict.fromkeys(int(i) for i in ids)
+
+    def __contains__(self, item):
+        return int(item) in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __repr__(self):
+        return f"IdSet({list(self._ids)})"
+
+    def add(self, item):
+        self._ids[int(item)] = None
+
+    def discard(self, item):
+        self._ids.pop(int(item), None)
+
+    def toggle(self, item):
+        """Add or remove ``item``; True if it is now in the set"""
+        item = int(item)
+        if item in self._ids:
+            del self._ids[item]
+            return False
+        self._ids[item] = None
+        return True
+
+    def first(self, n):
+        """The ``n`` oldest ids"""
+        return [item for item, _ in zip(self._ids, range(n))]
+
+    def to_array(self):
+        return np.fromiter(self._ids, dtype=np.int64, count=len(self._ids))
+
+    def nbytes(self):
+        return sys.getsizeof(self._ids) + sum(sys.getsizeof(item) for item in self._ids)
+
+
+def deep_sizeof(value, seen=None):
+    """Approximate bytes held by ``value`` and everything it references"""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if callable(getattr(value, "nbytes", None)):
+        return sys.getsizeof(value) + value.nbytes()
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (value.nbytes if value.base is None else 0)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    return size
+
+
+def session_footprint(state):
+    """(total bytes, {key: bytes}) for a session state mapping"""
+    sizes = {str(key): deep_sizeof(state[key]) for key in list(state.keys())}
+    return sum(sizes.values()), sizes
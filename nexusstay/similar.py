@@ -0,0 +1,342 @@
+"""Item-to-item "similar stays" recommendations.
+
+Each listing's ``TOP_N`` most similar listings are computed once per catalog
+snapshot. Similarity blends amenity Jaccard (popcount over the amenity
+bitsets), same type, same location, price band and guest capacity. Catalogs
+up to ``EXACT_ROWS`` compare every pair. Larger ones compare each listing
+with its price neighbours in the same location and in the same type (windows
+over price-sorted groups), in chunks, in a process pool past ``POOL_ROWS``.
+
+Neighbours are stored as an ``int32`` matrix of listing ids (``-1`` padded)
+with ``float16`` scores, cached per catalog version. A new snapshot is
+updated incrementally from the newest cached one sharing most of its
+listings, and the superseded set is deleted. Only new or changed
+listings, and listings whose neighbours changed or disappeared, are
+recomputed; new listings are then merged into the lists of their candidates.
+"""
+
+import glob
+import os
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from nexusstay.amenities import popcount
+
+TOP_N = 12
+WEIGHTS = {"amenities": 0.35, "type": 0.2, "location": 0.2, "price": 0.15, "guests": 0.1}
+# Price similarity is exp(-|ln(a / b)| / PRICE_BAND): +-35% scores about 0.37
+PRICE_BAND = 0.35
+EXACT_ROWS = 4096
+WINDOW = 128
+CHUNK_CELLS = 1 << 20
+POOL_ROWS = 200_000
+# Past this share of changed listings a full rebuild is cheaper than an update
+REBUILD_SHARE = 0.5
+# Cached neighbour sets kept per cache directory (e.g. the app's catalog and a benchmark one)
+KEEP_VERSIONS = 2
+
+Features = namedtuple("Features", ["ids", "bits", "counts", "types", "locations", "log_price", "guests"])
+
+
+def features(snapshot):
+    """Per-row arrays the similarity score is computed from"""
+    frame = snapshot.frame
+    bits = np.ascontiguousarray(snapshot.amenity_index.bits)
+    return Features(
+        ids=frame["id"].to_numpy(np.int32),
+        bits=bits,
+        counts=popcount(bits).sum(axis=1).astype(np.int16),
+        types=frame["type"].cat.codes.to_numpy(np.int16),
+        locations=frame["location"].cat.codes.to_numpy(np.int32),
+        log_price=np.log(np.maximum(frame["price"].to_numpy(np.float32), 1)),
+        guests=np.maximum(frame["guests"].to_numpy(np.float32), 1),
+    )
+
+
+def fingerprints(snapshot):
+    """Hash of every field the score reads, per row (changes mark a listing dirty)"""
+    frame = snapshot.frame
+    keyed = pd.DataFrame({
+        "type": frame["type"].astype(str),
+        "location": frame["location"].astype(str),
+        "price": frame["price"],
+        "guests": frame["guests"],
+        "amenities": frame["amenities"].map(lambda names: "|".join(sorted(names))),
+    })
+    return pd.util.hash_pandas_object(keyed, index=False).to_numpy(np.uint64)
+
+
+def pair_scores(f, rows, candidates):
+    """Similarity of each of ``rows`` (m,) to its candidate rows (m, c); padding and self score -inf"""
+    valid = (candidates >= 0) & (candidates != rows[:, None])
+    other = np.where(valid, candidates, 0)
+    row = rows[:, None]
+    shared = popcount(f.bits[row] & f.bits[other]).sum(axis=-1)
+    union = f.counts[row] + f.counts[other] - shared
+    jaccard = np.where(union > 0, shared / np.maximum(union, 1), 1.0)
+    guests = f.guests[row], f.guests[other]
+    scores = (WEIGHTS["amenities"] * jaccard
+              + WEIGHTS["type"] * (f.types[row] == f.types[other])
+              + WEIGHTS["location"] * (f.locations[row] == f.locations[other])
+              + WEIGHTS["price"] * np.exp(-np.abs(f.log_price[row] - f.log_price[other]) / PRICE_BAND)
+              + WEIGHTS["guests"] * np.minimum(*guests) / np.maximum(*guests)).astype(np.float32)
+    scores[~valid] = -np.inf
+    return scores
+
+
+def _windows(group, log_price, rows, width):
+    """(len(rows), 2 * width + 1) rows nearest in price within each row's group, -1 padded"""
+    order = np.lexsort((log_price, group))
+    position = np.empty_like(order)
+    position[order] = np.arange(len(order))
+    sorted_group = group[order]
+    start = np.searchsorted(sorted_group, group[rows], side="left")
+    stop = np.searchsorted(sorted_group, group[rows], side="right")
+    size = 2 * width + 1
+    low = np.clip(position[rows] - width, start, np.maximum(start, stop - size))
+    slots = low[:, None] + np.arange(size)
+    inside = slots < stop[:, None]
+    return np.where(inside, order[np.minimum(slots, len(order) - 1)], -1)
+
+
+def candidates(f, rows, exact):
+    """Candidate rows for ``rows``: everything when ``exact``, else price windows by location and by type"""
+    if exact:
+        return np.broadcast_to(np.arange(len(f.ids)), (len(rows), len(f.ids)))
+    found = np.concatenate([
+        _windows(f.locations, f.log_price, rows, WINDOW),
+        _windows(f.types, f.log_price, rows, WINDOW // 2),
+    ], axis=1)
+    # A listing in both windows would otherwise fill two neighbour slots
+    found.sort(axis=1)
+    found[:, 1:][found[:, 1:] == found[:, :-1]] = -1
+    return found
+
+
+def top_neighbours(f, rows, found, scores, n=TOP_N):
+    """(ids int32, scores float16) of the ``n`` best candidates per row, best first"""
+    n = min(n, scores.shape[1])
+    best = np.argpartition(-scores, n - 1, axis=1)[:, :n] if n < scores.shape[1] else np.tile(np.arange(n), (len(rows), 1))
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    ranked = np.argsort(-best_scores, axis=1, kind="stable")
+    best = np.take_along_axis(best, ranked, axis=1)
+    best_scores = np.take_along_axis(best_scores, ranked, axis=1)
+    ids = np.where(np.isfinite(best_scores), f.ids[np.take_along_axis(np.asarray(found), best, axis=1)], -1)
+    out_ids = np.full((len(rows), TOP_N), -1, dtype=np.int32)
+    out_scores = np.zeros((len(rows), TOP_N), dtype=np.float16)
+    out_ids[:, :n] = ids
+    out_scores[:, :n] = np.where(np.isfinite(best_scores), best_scores, 0)
+    return out_ids, out_scores
+
+
+def _chunk(f, rows, exact):
+    found = candidates(f, rows, exact)
+    return top_neighbours(f, rows, found, pair_scores(f, rows, found))
+
+
+_worker_state = {}
+
+
+def _init_worker(f, exact):
+    _worker_state["args"] = (f, exact)
+
+
+def _pooled_chunk(rows):
+    f, exact = _worker_state["args"]
+    return _chunk(f, rows, exact)
+
+
+def compute(f, rows=None, workers=None):
+    """Neighbour (ids, scores) for ``rows`` (default: all), chunked and pooled for large catalogs"""
+    rows = np.arange(len(f.ids)) if rows is None else np.asarray(rows)
+    exact = len(f.ids) <= EXACT_ROWS
+    width = len(f.ids) if exact else 3 * WINDOW + 2
+    step = max(1, CHUNK_CELLS // max(width, 1))
+    chunks = [rows[start:start + step] for start in range(0, len(rows), step)]
+    if len(rows) >= POOL_ROWS and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(f, exact)) as pool:
+            results = list(pool.map(_pooled_chunk, chunks))
+    else:
+        results = [_chunk(f, chunk, exact) for chunk in chunks]
+    if not results:
+        return np.zeros((0, TOP_N), dtype=np.int32), np.zeros((0, TOP_N), dtype=np.float16)
+    return np.concatenate([ids for ids, _ in results]), np.concatenate([scores for _, scores in results])
+
+
+def update(f, keys, previous, workers=None):
+    """Neighbours for a new snapshot reusing ``previous`` (ids, keys, neighbour ids, scores) where valid"""
+    old_ids, old_keys, old_neighbours, old_scores = previous
+    old_row = pd.Index(old_ids).get_indexer(f.ids)
+    changed = old_row < 0
+    changed[~changed] = old_keys[old_row[~changed]] != keys[~changed]
+    if changed.mean() > REBUILD_SHARE:
+        return compute(f, workers=workers)
+    neighbours = np.full((len(f.ids), TOP_N), -1, dtype=np.int32)
+    scores = np.zeros((len(f.ids), TOP_N), dtype=np.float16)
+    neighbours[~changed] = old_neighbours[old_row[~changed]]
+    scores[~changed] = old_scores[old_row[~changed]]
+    # Lists naming a changed or removed listing are stale; those rows are recomputed too
+    stale_ids = np.setdiff1d(old_ids, f.ids[~changed])
+    kept = ~changed & ~np.isin(neighbours, stale_ids).any(axis=1)
+    dirty = np.flatnonzero(~kept)
+    if len(dirty):
+        neighbours[dirty], scores[dirty] = compute(f, dirty, workers)
+
+    # New and changed listings may now belong in the lists of unchanged ones
+    changed = np.flatnonzero(changed)
+    if not len(changed):
+        return neighbours, scores
+    found = candidates(f, changed, len(f.ids) <= EXACT_ROWS)
+    pair = pair_scores(f, changed, found)
+    source, slot = np.nonzero(np.isfinite(pair))
+    target, value, source = found[source, slot], pair[source, slot], changed[source]
+    keep = kept[target]
+    target, value, source = target[keep], value[keep], source[keep]
+    order = np.argsort(target, kind="stable")
+    target, value, source = target[order], value[order], source[order]
+    for group in np.split(np.arange(len(target)), np.flatnonzero(np.diff(target)) + 1):
+        if not len(group):
+            continue
+        row = target[group[0]]
+        pool_ids = np.concatenate([neighbours[row], f.ids[source[group]]])
+        pool_scores = np.concatenate([scores[row].astype(np.float32), value[group]])
+        pool_scores[pool_ids < 0] = -np.inf
+        best = np.argsort(-pool_scores, kind="stable")[:TOP_N]
+        neighbours[row] = np.where(np.isfinite(pool_scores[best]), pool_ids[best], -1)
+        scores[row] = np.where(np.isfinite(pool_scores[best]), pool_scores[best], 0)
+    return neighbours, scores
+
+
+def _cache_files(cache_dir, version):
+    return {name: os.path.join(cache_dir, f"similar-{version}-{name}.npy") for name in ("ids", "keys", "neighbours", "scores")}
+
+
+def _save(path, values):
+    """Write an array through a temporary file so concurrent readers never see a partial ``.npy``"""
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as out:
+            np.save(out, values)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def _cached_versions(cache_dir):
+    """Versions with a cached neighbour set, newest first"""
+    paths = sorted(glob.glob(os.path.join(cache_dir, "similar-*-ids.npy")), key=os.path.getmtime, reverse=True)
+    return [os.path.basename(path)[len("similar-"):-len("-ids.npy")] for path in paths]
+
+
+def _previous_cached(cache_dir, snapshot_version, ids):
+    """(version, (ids, keys, neighbours, scores)) of the newest other snapshot worth updating from, or None"""
+    for version in _cached_versions(cache_dir):
+        if version == snapshot_version:
+            continue
+        files = _cache_files(cache_dir, version)
+        try:
+            # A snapshot of an unrelated catalog (e.g. a benchmark one in the same directory) is not a base
+            if np.isin(ids, np.load(files["ids"])).mean() < 1 - REBUILD_SHARE:
+                continue
+            return version, tuple(np.load(files[name]) for name in ("ids", "keys", "neighbours", "scores"))
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def _prune(cache_dir, superseded, keep=KEEP_VERSIONS):
+    """Delete the ``superseded`` neighbour set and any beyond the ``keep`` newest"""
+    versions = _cached_versions(cache_dir)
+    for version in set(versions[keep:]) | (set(superseded) & set(versions)):
+        for path in _cache_files(cache_dir, version).values():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class SimilarityIndex:
+    def __init__(self, snapshot, neighbours, scores):
+        self.snapshot = snapshot
+        self.neighbours = neighbours
+        self.scores = scores
+
+    @classmethod
+    def build(cls, snapshot, workers=None):
+        neighbours, scores = compute(features(snapshot), workers=workers)
+        return cls(snapshot, neighbours, scores)
+
+    @classmethod
+    def for_snapshot(cls, snapshot, cache_dir=None, workers=None):
+        """Load the snapshot's neighbours from the cache, updating the latest cached snapshot if needed"""
+        if cache_dir is None:
+            return cls.build(snapshot, workers)
+        files = _cache_files(cache_dir, snapshot.version)
+        if all(os.path.exists(path) for path in files.values()):
+            return cls(snapshot, np.load(files["neighbours"], mmap_mode="r"), np.load(files["scores"], mmap_mode="r"))
+        f, keys = features(snapshot), fingerprints(snapshot)
+        previous = _previous_cached(cache_dir, snapshot.version, f.ids) if os.path.isdir(cache_dir) else None
+        neighbours, scores = update(f, keys, previous[1], workers) if previous else compute(f, workers=workers)
+        os.makedirs(cache_dir, exist_ok=True)
+        # "ids" goes last: cached versions are found by their ids file, so a set is only seen once complete
+        for name, values in (("keys", keys), ("scores", scores), ("neighbours", neighbours), ("ids", f.ids)):
+            _save(files[name], values)
+        _prune(cache_dir, [previous[0]] if previous else [])
+        return cls(snapshot, neighbours, scores)
+
+    def __len__(self):
+        return len(self.neighbours)
+
+    def similar(self, row, k=3):
+        """Rows of the ``k`` listings most similar to ``row``, best first"""
+        ids = np.asarray(self.neighbours[row])
+        rows = self.snapshot.rows_for_ids(ids[ids >= 0])
+        return rows[rows >= 0][:k]
+
+    @cached_property
+    def prototypes(self):
+        """One representative row per (location, type): the listing nearest the group's median price"""
+        f = features(self.snapshot)
+        groups = pd.DataFrame({"location": f.locations, "type": f.types, "log_price": f.log_price})
+        distance = (groups["log_price"] - groups.groupby(["location", "type"])["log_price"].transform("median")).abs()
+        return np.sort(distance.groupby([groups["location"], groups["type"]]).idxmin().to_numpy())
+
+    def _query_scores(self, rows, price, types, locations, amenities, guests):
+        frame = self.snapshot.frame
+        score = np.zeros(len(rows), dtype=np.float32)
+        for column, wanted in (("type", types), ("location", locations)):
+            if wanted:
+                codes = frame[column].cat.categories.get_indexer(list(wanted))
+                score += WEIGHTS[column] * np.isin(frame[column].cat.codes.to_numpy()[rows], codes)
+        if price:
+            low, high = price
+            low = max(low or 0, 1)
+            prices = frame["price"].to_numpy()[rows].astype(np.float32)
+            target = np.clip(prices, low, np.inf if high is None else max(high, low))
+            score += WEIGHTS["price"] * np.exp(-np.abs(np.log(np.maximum(prices, 1) / target)) / PRICE_BAND)
+        if amenities:
+            score += WEIGHTS["amenities"] * self.snapshot.amenity_index.match_fraction(amenities, rows)
+        if guests:
+            score += WEIGHTS["guests"] * np.minimum(frame["guests"].to_numpy()[rows] / guests, 1)
+        return score
+
+    def alternatives(self, price=None, types=(), locations=(), amenities=(), guests=None, k=3, anchors=3):
+        """Rows closest to a search that matched nothing, best first
+
+        The group prototypes are scored against the request and the best
+        ``anchors`` of them, with their precomputed neighbours, are reranked.
+        The work depends on the number of groups, not on the catalog size.
+        """
+        prototypes = self.prototypes
+        if not len(prototypes):
+            return prototypes
+        request = (price, types, locations, amenities, guests)
+        best = prototypes[np.argsort(-self._query_scores(prototypes, *request), kind="stable")[:anchors]]
+        pool = np.unique(np.concatenate([best] + [self.similar(row, TOP_N) for row in best]))
+        return pool[np.argsort(-self._query_scores(pool, *request), kind="stable")[:k]]
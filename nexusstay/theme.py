@@ -0,0 +1,95 @@
+"""Static page assets, built once per server process.
+
+The dark theme lives in ``theme.css`` and is minified on import. The
+analytics cards, destination cards and footer never change between reruns,
+so each is rendered here to one HTML block (the destination block once per
+thumbnail manifest). The page then sends a single element for each instead
+of a grid of columns holding one markdown call per line.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+STATS = [
+    ("1.2K+", "AI-Matched Properties"),
+    ("4.9⭐", "AI Verified Rating"),
+    ("50+", "AI Optimized Locations"),
+    ("24/7", "AI Concierge"),
+    ("98%", "AI Accuracy"),
+]
+
+DESTINATIONS = [
+    {"name": "New York", "image": "https://images.unsplash.com/photo-1485738422979-f5c462d49f74?q=80&w=2099&auto=format&fit=crop", "properties": "1,200+", "rating": "4.8", "ai_tip": "Trending: Luxury apartments"},
+    {"name": "Paris", "image": "https://images.unsplash.com/photo-1546436836-07a91091f160?q=80&w=2074&auto=format&fit=crop", "properties": "800+", "rating": "4.9", "ai_tip": "Romantic getaways"},
+    {"name": "Tokyo", "image": "https://img.traveltriangle.com/blog/wp-content/uploads/2019/12/Places-To-Visit-In-Tokyo-6_dec.jpg", "properties": "950+", "rating": "4.7", "ai_tip": "Modern luxury"},
+    {"name": "Bali", "image": "https://images.unsplash.com/photo-1566073771259-6a8506099945?q=80&w=2070&auto=format&fit=crop", "properties": "1,500+", "rating": "4.9", "ai_tip": "Beach villas"}
+]
+
+FOOTER_LINKS = [
+    ("🏰 NexusStay AI", ["Smart Search", "AI Matching", "Predictive Analytics"]),
+    ("🛡️ AI Support", ["24/7 AI Concierge", "Smart Safety", "AI Verification"]),
+    ("🌟 AI Hosting", ["Become AI Host", "Smart Pricing", "AI Community"]),
+    ("📱 AI Experience", ["AI Mobile App", "Virtual AI Tours", "Smart Loyalty"]),
+    ("🔗 AI Connect", ["AI Blog", "Smart Updates", "AI Research"]),
+]
+
+
+def minify_css(css):
+    """Drop comments and insignificant whitespace (string literals in ``content`` are kept)"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def _grid(columns, cells):
+    return (f"<div style='display: grid; grid-template-columns: repeat(auto-fit, minmax({columns}, 1fr)); gap: 1rem;'>"
+            + "".join(cells) + "</div>")
+
+
+def _stats_card(number, label):
+    return (f"<div class='stats-card-dark'><div class='stats-number'>{number}</div>"
+            f"<div class='stats-label'>{label}</div></div>")
+
+
+def _destination_card(dest, image):
+    return f"""<div style='background: linear-gradient(145deg, var(--card-dark) 0%, var(--card-darker) 100%);
+            border-radius: 15px; padding: 0; overflow: hidden; border: 1px solid var(--border);'>
+    <img src='{image}' style='width: 100%; height: 120px; object-fit: cover;'>
+    <div style='padding: 1rem;'>
+        <h4 style='color: var(--text-primary); margin: 0;'>{dest['name']}</h4>
+        <p style='color: var(--text-secondary); margin: 0.5rem 0; font-size: 0.9rem;'>
+            <strong>{dest['properties']}</strong> AI-optimized
+        </p>
+        <div style='color: #FFB800; font-size: 0.8rem;'>🤖 {dest['rating']} rating</div>
+        <div style='color: #00D4AA; font-size: 0.7rem; margin-top: 0.5rem;'>💡 {dest['ai_tip']}</div>
+    </div>
+</div>"""
+
+
+def _footer_column(title, links):
+    return (f"<div><p style='font-weight: 700; margin-bottom: 0.5rem;'>{title}</p>"
+            + "".join(f"<p style='margin: 0.25rem 0; color: var(--text-secondary);'>{link}</p>" for link in links)
+            + "</div>")
+
+
+@lru_cache(maxsize=4)
+def destinations_html(thumbnails=None):
+    """Destination cards block, with images served through ``thumbnails`` when given"""
+    return _grid("200px", [
+        _destination_card(dest, thumbnails.url(dest["image"], "destination") if thumbnails is not None else dest["image"])
+        for dest in DESTINATIONS
+    ])
+
+
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "theme.css"), encoding="utf-8") as handle:
+    STYLE = f"<style>{minify_css(handle.read())}</style>"
+
+STATS_HTML = _grid("150px", [_stats_card(number, label) for number, label in STATS])
+FOOTER_HTML = _grid("150px", [_footer_column(title, links) for title, links in FOOTER_LINKS]) + """
+<div style='text-align: center; color: #666; padding: 2rem; background: var(--card-darker); border-radius: 15px; margin-top: 2rem; border: 1px solid var(--border);'>
+    <p style='margin: 0;'>© NexusStay AI Elite. Powered by Artificial Intelligence by Tanmay.</p>
+    <p style='margin: 0.5rem 0 0 0; color: var(--text-secondary);'>AI Privacy · Smart Terms · Neural Sitemap · ML Standards</p>
+</div>"""
@@ -0,0 +1,32 @@
+from datetime import date
+
+import pytest
+
+from nexusstay.ledger import BookingLedger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = BookingLedger(str(tmp_path / "bookings.db"))
+    yield ledger
+    ledger.close()
+
+
+def test_overlapping_booking_is_rejected(ledger):
+    first = ledger.book(7, date(2030, 5, 1), date(2030, 5, 5), 2, 300)
+    second = ledger.book(7, date(2030, 5, 4), date(2030, 5, 8), 2, 300)
+    assert first.booking_id is not None
+    assert second.booking_id is None
+    assert second.reason
+
+
+def test_back_to_back_and_other_listings_are_accepted(ledger):
+    assert ledger.book(7, date(2030, 5, 1), date(2030, 5, 5), 2, 300).booking_id is not None
+    assert ledger.book(7, date(2030, 5, 5), date(2030, 5, 8), 2, 300).booking_id is not None
+    assert ledger.book(8, date(2030, 5, 1), date(2030, 5, 5), 2, 300).booking_id is not None
+
+
+def test_concurrent_overlaps_book_once(ledger):
+    futures = [ledger.submit(7, date(2030, 6, 1), date(2030, 6, 4), 2, 300) for _ in range(20)]
+    booked = [future.result(10).booking_id for future in futures]
+    assert sum(booking_id is not None for booking_id in booked) == 1
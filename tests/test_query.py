@@ -0,0 +1,53 @@
+import pytest
+
+from nexusstay.catalog import from_records
+from nexusstay.chatbot import NexusStayChatbot
+from nexusstay.filters import evaluate
+from nexusstay.query import answers_from_catalog, normalize
+from nexusstay.seed import SEED_PROPERTIES
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return from_records(SEED_PROPERTIES)
+
+
+@pytest.fixture(scope="module")
+def compiler(snapshot):
+    return snapshot.query_compiler
+
+
+def test_stay_length_after_for_is_not_a_party(compiler):
+    query = compiler.parse(normalize("stay for 3 nights under 900"))
+    assert query.guests is None
+    assert query.price == (None, 900)
+
+
+def test_party_size_after_for(compiler):
+    assert compiler.parse(normalize("villa for 4")).guests == 4
+    assert compiler.parse(normalize("villa for 4 under $900")).price == (None, 900)
+
+
+@pytest.mark.parametrize("text, high", [("under 1.5k", 1500), ("$2.5k villa", 2500), ("below $1,250", 1250)])
+def test_decimal_amounts(compiler, text, high):
+    assert compiler.parse(normalize(text)).price == (None, high)
+
+
+def test_intent_tip_is_not_a_listing_query(compiler):
+    text = "Best locations for couples"
+    query = compiler.parse(normalize(text))
+    assert query.guests == 2
+    assert not answers_from_catalog(query, NexusStayChatbot().rank(text))
+
+
+@pytest.mark.parametrize("text", ["Find beach properties", "Family-friendly stays"])
+def test_listing_tips_return_listings(snapshot, compiler, text):
+    query = compiler.parse(normalize(text))
+    assert answers_from_catalog(query, NexusStayChatbot().rank(text))
+    rows = evaluate(snapshot, compiler.filter_state(query))
+    assert len(rows)
+    assert "match" in compiler.reply(query, rows)
+
+
+def test_listing_request_is_specific(compiler):
+    assert compiler.parse(normalize("beach house in Malibu for couples")).specific